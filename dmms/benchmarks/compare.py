@@ -0,0 +1,53 @@
+"""Compare benchmark results of two commits
+
+Usage: python -m dmms.benchmarks.compare old.json new.json --threshold 0.2
+Exits with status 1 if any case got slower by more than threshold or
+runs more queries.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def regressions(old: dict, new: dict, threshold: float) -> List[str]:
+    """Get descriptions of cases which got slower or run more queries"""
+    found = []
+    for name, new_result in new['results'].items():
+        old_result = old['results'].get(name)
+        # check if case is new, then there is nothing to compare with
+        if old_result is None:
+            continue
+        ratio = new_result['median_ms'] / old_result['median_ms']
+        if ratio > 1 + threshold:
+            found.append(f'{name}: {old_result["median_ms"]:.2f} ms -> '
+                         f'{new_result["median_ms"]:.2f} ms '
+                         f'({ratio:.2f}x)')
+        if new_result['queries'] > old_result['queries']:
+            found.append(f'{name}: {old_result["queries"]:.1f} -> '
+                         f'{new_result["queries"]:.1f} queries')
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown of median time')
+    args = parser.parse_args(argv)
+    with open(args.old) as old_file, open(args.new) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    # check if results were measured on different datasets
+    for key in ('employees', 'departments', 'database'):
+        if old['meta'][key] != new['meta'][key]:
+            print(f'Warning: {key} differ: {old["meta"][key]} and '
+                  f'{new["meta"][key]}')
+    found = regressions(old, new, args.threshold)
+    for line in found:
+        print(line)
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
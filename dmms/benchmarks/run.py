@@ -0,0 +1,231 @@
+"""Time every verb of REST resources on seeded dataset
+
+Usage: python -m dmms.benchmarks.run --dataset small --output results.json
+Exits with status 1 if median time of any case exceeds its budget.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional
+
+# benchmark database and config have to be set before app is imported,
+# ENV of shell is replaced, so tables of other databases aren't dropped
+os.environ['ENV'] = 'BENCHMARK'
+
+from sqlalchemy import event  # noqa: E402
+
+from dmms.benchmarks.seed import DATASETS, seed  # noqa: E402
+from dmms.models.model import DepartmentsModel, EmployeesModel  # noqa: E402
+from dmms.rest.app import app  # noqa: E402
+from dmms.service.db import db  # noqa: E402
+from dmms.service.versions import write_versions  # noqa: E402
+
+# median time of salary statistics of 1M employees, in milliseconds
+SALARY_STATS_BUDGET_MS = 50
+
+
+class Case:
+    """Request measured by benchmark"""
+    def __init__(self, name: str, method: str,
+                 path: Callable[[int], str],
+                 query_string: Optional[dict] = None,
+                 json_body: Optional[Callable[[int], Any]] = None,
+                 setup: Optional[Callable[[int], Any]] = None,
+                 budget_ms: Optional[float] = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.query_string = query_string
+        self.json_body = json_body
+        self.setup = setup
+        self.budget_ms = budget_ms
+
+
+def new_department(number: int) -> int:
+    """Create department to be deleted by benchmark, return its id"""
+    department = DepartmentsModel(name=f'Deleted{number}')
+    db.session.add(department)
+    db.session.commit()
+    return department.id
+
+
+def new_employee(number: int) -> int:
+    """Create employee to be deleted by benchmark, return its id"""
+    employee = EmployeesModel(name=f'Deleted{number}',
+                              date_of_birth='1990-01-01', salary=1000)
+    db.session.add(employee)
+    db.session.commit()
+    return employee.id
+
+
+def change_employees(number: int) -> int:
+    """Increment version of employees, so salaries are read again"""
+    write_versions([EmployeesModel.__tablename__])
+    return number
+
+
+def cases() -> List[Case]:
+    """Get requests covering all verbs of Departments and Employees"""
+    return [
+        Case('departments_get_page', 'get', lambda _: '/departments'),
+        Case('departments_get_page_short', 'get', lambda _: '/departments',
+             query_string={'include': 'none'}),
+        Case('departments_get_by_id', 'get', lambda _: '/departments',
+             query_string={'id': ['1']}),
+        Case('departments_get_by_name', 'get', lambda _: '/departments',
+             query_string={'name': 'Department1', 'include': 'none'}),
+        Case('departments_get_summary', 'get',
+             lambda _: '/departments/summary'),
+        Case('departments_get_salary_stats', 'get',
+             lambda _: '/departments/1/salary-stats',
+             budget_ms=SALARY_STATS_BUDGET_MS),
+        Case('salary_stats_get', 'get', lambda _: '/salary-stats',
+             budget_ms=SALARY_STATS_BUDGET_MS),
+        Case('salary_stats_get_100_buckets', 'get',
+             lambda _: '/salary-stats', query_string={'buckets': 100},
+             budget_ms=SALARY_STATS_BUDGET_MS),
+        # every request reads salaries from database after write
+        Case('salary_stats_get_after_write', 'get',
+             lambda _: '/salary-stats', setup=change_employees),
+        Case('departments_post', 'post', lambda _: '/departments',
+             json_body=lambda number: {'name': f'Created{number}'}),
+        Case('departments_put', 'put', lambda _: '/departments/1',
+             json_body=lambda number: {'name': f'Renamed{number}'}),
+        Case('departments_patch', 'patch', lambda _: '/departments',
+             json_body=lambda number: {'ids': [2],
+                                       'set': {'name': f'Patched{number}'}}),
+        Case('departments_delete', 'delete',
+             lambda department_id: f'/departments/{department_id}',
+             setup=new_department),
+        Case('employees_get_page', 'get', lambda _: '/employees'),
+        Case('employees_get_page_department_name', 'get',
+             lambda _: '/employees',
+             query_string={'include': 'department_name'}),
+        Case('employees_get_by_id', 'get', lambda _: '/employees',
+             query_string={'id': [str(number) for number in range(1, 11)]}),
+        Case('employees_get_by_birthday', 'get', lambda _: '/employees',
+             query_string={'date_of_birth_start': '1980-01-01',
+                           'date_of_birth_end': '1980-12-31'}),
+        Case('employees_get_by_department', 'get', lambda _: '/employees',
+             query_string={'department_id': '1', 'sort': '-salary'}),
+        Case('employees_post', 'post', lambda _: '/employees',
+             json_body=lambda number: {'name': f'Created{number}',
+                                       'date_of_birth': '1990-01-01',
+                                       'salary': 1000,
+                                       'department_id': 1}),
+        Case('employees_put', 'put', lambda _: '/employees/1',
+             json_body=lambda number: {'salary': 1000 + number}),
+        Case('employees_patch', 'patch', lambda _: '/employees',
+             json_body=lambda number: {'ids': list(range(1, 101)),
+                                       'set': {'salary': 1000 + number}}),
+        Case('employees_delete', 'delete',
+             lambda employee_id: f'/employees/{employee_id}',
+             setup=new_employee),
+    ]
+
+
+def measure(case: Case, repeat: int, numbers: count) -> Dict[str, float]:
+    """Run request of case repeat times, get timings and queries"""
+    client = app.test_client()
+    queries = []
+    timings = []
+
+    def count_query(*args):
+        queries[-1] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count_query)
+    try:
+        for _ in range(repeat):
+            number = next(numbers)
+            queries.append(0)
+            value = case.setup(number) if case.setup else number
+            # queries of setup aren't counted
+            queries[-1] = 0
+            kwargs = {'query_string': case.query_string}
+            if case.json_body:
+                kwargs['json'] = case.json_body(number)
+            start = time.perf_counter()
+            response = getattr(client, case.method)(case.path(value),
+                                                    **kwargs)
+            timings.append(time.perf_counter() - start)
+            # check if request failed, then timings are meaningless
+            if response.status_code >= 400:
+                raise RuntimeError(f'{case.name} returned '
+                                   f'{response.status_code}: '
+                                   f'{response.get_data(as_text=True)}')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_query)
+    timings.sort()
+    return {
+        'median_ms': statistics.median(timings) * 1000,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p95_ms': timings[int(len(timings) * 0.95) - 1] * 1000
+        if len(timings) >= 20 else timings[-1] * 1000,
+        'queries': statistics.mean(queries),
+        'budget_ms': case.budget_ms,
+    }
+
+
+def over_budget(results: Dict[str, dict]) -> List[str]:
+    """Get descriptions of cases whose median time exceeds budget"""
+    return [f'{name}: {result["median_ms"]:.2f} ms > '
+            f'{result["budget_ms"]:.2f} ms budget'
+            for name, result in results.items()
+            if result.get('budget_ms') is not None and
+            result['median_ms'] > result['budget_ms']]
+
+
+def run(employees: int, departments: int, repeat: int,
+        seed_value: int = 0) -> dict:
+    """Seed dataset and measure all cases"""
+    with app.app_context():
+        start = time.perf_counter()
+        seed(employees, departments, seed_value)
+        seconds = time.perf_counter() - start
+        numbers = count(1)
+        results = {case.name: measure(case, repeat, numbers)
+                   for case in cases()}
+        dialect = db.engine.dialect.name
+    return {
+        'meta': {'employees': employees, 'departments': departments,
+                 'repeat': repeat, 'seed': seed_value,
+                 'seed_seconds': seconds, 'database': dialect,
+                 'python': platform.python_version()},
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', choices=sorted(DATASETS),
+                        default='small')
+    parser.add_argument('--employees', type=int,
+                        help='number of employees instead of dataset')
+    parser.add_argument('--departments', type=int,
+                        help='number of departments instead of dataset')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to write JSON results to')
+    args = parser.parse_args(argv)
+    employees, departments = DATASETS[args.dataset]
+    report = run(args.employees or employees,
+                 args.departments or departments, args.repeat, args.seed)
+    for name, result in report['results'].items():
+        print(f'{name:40} {result["median_ms"]:9.2f} ms '
+              f'{result["queries"]:6.1f} queries')
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    found = over_budget(report['results'])
+    for line in found:
+        print(line)
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
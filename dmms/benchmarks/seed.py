@@ -0,0 +1,50 @@
+import random
+from datetime import date, timedelta
+
+from flask import current_app
+
+from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.config import BenchmarkConfig
+from dmms.service.db import db
+from dmms.service.versions import bump_version
+
+# number of employees and departments of predefined datasets
+DATASETS = {
+    'small': (1000, 10),
+    'medium': (100000, 100),
+    'large': (1000000, 1000),
+}
+SEED_BATCH_SIZE = 10000
+
+
+def check_database() -> None:
+    """Refuse to recreate tables of database not meant for benchmarks"""
+    # check if app uses benchmark database
+    if current_app.config['SQLALCHEMY_DATABASE_URI'] != \
+            BenchmarkConfig.SQLALCHEMY_DATABASE_URI:
+        raise RuntimeError(f'Dataset is seeded only to database of '
+                           f'BenchmarkConfig, not {db.engine.url!r}')
+
+
+def seed(employees: int, departments: int, seed_value: int = 0) -> None:
+    """Recreate tables and fill them with reproducible random rows"""
+    check_database()
+    db.drop_all()
+    db.create_all()
+    generator = random.Random(seed_value)
+    db.session.execute(DepartmentsModel.__table__.insert(),
+                       [{'name': f'Department{number}'}
+                        for number in range(1, departments + 1)])
+    first_birthday = date(1950, 1, 1)
+    for start in range(0, employees, SEED_BATCH_SIZE):
+        stop = min(start + SEED_BATCH_SIZE, employees)
+        db.session.execute(EmployeesModel.__table__.insert(), [
+            {'name': f'Employee{number}',
+             'date_of_birth': first_birthday + timedelta(
+                 days=generator.randrange(365 * 50)),
+             'salary': float(generator.randrange(500, 10000)),
+             'department_id': generator.randint(1, departments)}
+            for number in range(start + 1, stop + 1)])
+    bump_version(DepartmentsModel.__tablename__)
+    bump_version(EmployeesModel.__tablename__)
+    db.session.commit()
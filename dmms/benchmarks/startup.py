@@ -0,0 +1,86 @@
+"""Measure import time and cold start of apps in fresh processes
+
+Usage: python -m dmms.benchmarks.startup --repeat 10 --output startup.json
+Results can be compared with dmms.benchmarks.compare.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# name of case: module:attribute of app (or call of factory of app)
+# and path of first request
+TARGETS = {
+    'import_rest': ('dmms.rest.app:app', None),
+    'import_views': ('dmms.views.app:app', None),
+    'import_wsgi_rest': ('dmms.wsgi:create_rest_app()', None),
+    'import_wsgi_application': ('dmms.wsgi:create_application()', None),
+    'cold_start_rest': ('dmms.rest.app:app', '/health'),
+}
+
+# code run by fresh interpreter, prints seconds and number of queries
+CHILD = '''
+import importlib, json, sys, time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+queries = []
+event.listen(Engine, 'before_cursor_execute',
+             lambda *args: queries.append(1))
+start = time.perf_counter()
+module, attribute = sys.argv[1].split(':')
+app = getattr(importlib.import_module(module), attribute.rstrip('()'))
+if attribute.endswith('()'):
+    app = app()
+if sys.argv[2]:
+    app.test_client().get(sys.argv[2])
+print(json.dumps({'seconds': time.perf_counter() - start,
+                  'queries': len(queries)}))
+'''
+
+
+def measure(target: str, path: Optional[str], repeat: int) -> Dict:
+    """Start fresh interpreter repeat times, get timings and queries"""
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', CHILD, target,
+                                 path or ''], check=True,
+                                stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        timings.append(result['seconds'])
+        queries.append(result['queries'])
+    timings.sort()
+    return {
+        'median_ms': statistics.median(timings) * 1000,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p95_ms': timings[int(len(timings) * 0.95) - 1] * 1000
+        if len(timings) >= 20 else timings[-1] * 1000,
+        'queries': statistics.mean(queries),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', help='file to write JSON results to')
+    args = parser.parse_args(argv)
+    results = {name: measure(target, path, args.repeat)
+               for name, (target, path) in TARGETS.items()}
+    for name, result in results.items():
+        print(f'{name:40} {result["median_ms"]:9.2f} ms '
+              f'{result["queries"]:6.1f} queries')
+    if args.output:
+        report = {'meta': {'employees': None, 'departments': None,
+                           'database': None, 'repeat': args.repeat,
+                           'python': platform.python_version()},
+                  'results': results}
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare compiled schemas with reqparse parsers on typical requests
+
+Usage: python -m dmms.benchmarks.validation --number 10000
+"""
+import argparse
+import json
+import timeit
+from typing import List, Optional
+
+from dmms.rest.app import app
+from dmms.service import parsers
+
+# name of case: schema and arguments of test request
+CASES = {
+    'employees_get': (parsers.employee_get_schema,
+                      {'query_string': {'id': ['1', '2', '3'],
+                                        'limit': '50'}}),
+    'employees_get_birthday': (parsers.employee_get_schema,
+                               {'query_string': {
+                                   'date_of_birth_start': '1990-01-01',
+                                   'date_of_birth_end': '2000-01-01'}}),
+    'employees_post': (parsers.employee_post_schema,
+                       {'json': {'name': 'Employee1',
+                                 'date_of_birth': '1991-01-09',
+                                 'salary': 2500, 'department_id': 1}}),
+    'departments_put': (parsers.department_put_schema,
+                        {'json': {'name': 'Test1'}}),
+    'bulk_update': (parsers.bulk_update_schema,
+                    {'json': {'ids': list(range(100)),
+                              'set': {'salary': 1000}}}),
+}
+
+
+def measure(schema, request_kwargs: dict, number: int) -> dict:
+    """Time reqparse with checks and compiled schema on one request"""
+    parser = schema.to_reqparse()
+    checks = schema.checks()
+
+    def reqparse_with_checks():
+        args = parser.parse_args(strict=True)
+        for check in checks:
+            check(args)
+
+    with app.test_request_context('/', **request_kwargs):
+        reqparse_seconds = timeit.timeit(reqparse_with_checks, number=number)
+        schema_seconds = timeit.timeit(schema.parse_args, number=number)
+    return {'reqparse_us': reqparse_seconds / number * 1e6,
+            'schema_us': schema_seconds / number * 1e6,
+            'speedup': reqparse_seconds / schema_seconds}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=10000)
+    parser.add_argument('--output', help='file to write JSON results to')
+    args = parser.parse_args(argv)
+    results = {name: measure(schema, request_kwargs, args.number)
+               for name, (schema, request_kwargs) in CASES.items()}
+    for name, result in results.items():
+        print(f'{name:30} reqparse {result["reqparse_us"]:8.1f} us  '
+              f'schema {result["schema_us"]:8.1f} us  '
+              f'{result["speedup"]:5.1f}x')
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""Gunicorn settings of production server
+
+Usage: gunicorn -c dmms/gunicorn.conf.py 'dmms.wsgi:create_application()'
+Send HUP to master process to reload workers gracefully.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', 'localhost:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS',
+                             multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# threads of one worker share its database connection pool
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# time workers get to finish requests on reload or shutdown
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# restart workers after some requests to bound memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+# reload workers on code change, for development only
+reload = os.environ.get('GUNICORN_RELOAD', 'false').lower() == 'true'
+accesslog = '-'
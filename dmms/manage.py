@@ -1,11 +1,79 @@
-from flask_script import Manager
+from flask_script import Command, Manager, Option
 from flask_migrate import MigrateCommand
 
 from dmms.rest.app import app
+from dmms.service import counters, importer, query_plan
+from dmms.service.db import db
+from dmms.service.versions import (VERSIONED_TABLES, bump_version,
+                                   insert_missing_versions)
 
 manager = Manager(app)
 
+
+class ImportCommand(Command):
+    """Import departments and employees from CSV or NDJSON files"""
+    option_list = (
+        Option('-d', '--departments', dest='departments',
+               help='file with name of department in each record'),
+        Option('-e', '--employees', dest='employees',
+               help='file with name, date_of_birth, salary and '
+                    'department_id or department (name) in each record'),
+        Option('-b', '--batch-size', dest='batch_size', type=int,
+               help='number of rows inserted by one statement'),
+    )
+
+    def run(self, departments=None, employees=None, batch_size=None):
+        batch_size = batch_size or app.config['IMPORT_BATCH_SIZE']
+        report = importer.import_files(departments, employees, batch_size,
+                                       app.config['IMPORT_LOAD_DATA'])
+        for table, count, seconds in report:
+            rate = count / seconds if seconds else count
+            print(f'{table}: {count} rows in {seconds:.2f} s '
+                  f'({rate:.0f} rows/s)')
+
+
 manager.add_command('db', MigrateCommand)
+manager.add_command('import', ImportCommand())
+
+
+@manager.command
+def create_db():
+    """Create tables which don't exist yet"""
+    db.create_all()
+    # version rows exist before first write
+    insert_missing_versions(VERSIONED_TABLES)
+    db.session.commit()
+
+
+@manager.option('-c', '--check', dest='check', action='store_true',
+                help="only report wrong counters, don't fix them")
+def recount(check=False):
+    """Recompute headcount and salary sum counters of departments"""
+    wrong = counters.wrong_counters()
+    for row in wrong:
+        print(f"department {row['id']} {row['name']}: "
+              f"headcount {row['headcount']} instead of "
+              f"{row['actual_headcount']}, salary_sum {row['salary_sum']} "
+              f"instead of {row['actual_salary_sum']}")
+    if check:
+        # non-zero exit status tells that counters are wrong
+        return 1 if wrong else 0
+    count = counters.recount()
+    # cached summaries of departments are read again after commit
+    bump_version('departments')
+    db.session.commit()
+    print(f'{count} departments recounted, {len(wrong)} were wrong')
+    return 0
+
+
+@manager.command
+def explain():
+    """Print query plans of hot read paths"""
+    for name, query in query_plan.hot_read_queries().items():
+        print(f'{name}:')
+        for row in query_plan.explain(query):
+            print(f'    {row}')
+
 
 if __name__ == '__main__':
     manager.run()
@@ -0,0 +1,90 @@
+"""department counters
+
+Revision ID: 0c6e9b4d2a57
+Revises: f4a7c2e9b316
+Create Date: 2026-10-18 17:38:52.104736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c6e9b4d2a57'
+down_revision = 'f4a7c2e9b316'
+branch_labels = None
+depends_on = None
+
+# DDL is kept here as it was at this revision, so later changes of app
+# don't change the migration
+ADD_NEW = 'UPDATE departments SET headcount = headcount + 1, ' \
+          'salary_sum = salary_sum + {new}.salary ' \
+          'WHERE id = {new}.department_id;'
+REMOVE_OLD = 'UPDATE departments SET headcount = headcount - 1, ' \
+             'salary_sum = salary_sum - {old}.salary ' \
+             'WHERE id = {old}.department_id;'
+SQLITE_ADD, SQLITE_REMOVE = ADD_NEW.format(new='new'), \
+    REMOVE_OLD.format(old='old')
+MYSQL_ADD, MYSQL_REMOVE = ADD_NEW.format(new='NEW'), \
+    REMOVE_OLD.format(old='OLD')
+SQLITE_TRIGGERS = [
+    f'CREATE TRIGGER IF NOT EXISTS employees_counters_insert '
+    f'AFTER INSERT ON employees BEGIN {SQLITE_ADD} END',
+    f'CREATE TRIGGER IF NOT EXISTS employees_counters_delete '
+    f'AFTER DELETE ON employees BEGIN {SQLITE_REMOVE} END',
+    f'CREATE TRIGGER IF NOT EXISTS employees_counters_update '
+    f'AFTER UPDATE OF salary, department_id ON employees '
+    f'BEGIN {SQLITE_REMOVE} {SQLITE_ADD} END',
+]
+MYSQL_TRIGGERS = [
+    f'CREATE TRIGGER employees_counters_insert AFTER INSERT ON '
+    f'employees FOR EACH ROW {MYSQL_ADD.rstrip(";")}',
+    f'CREATE TRIGGER employees_counters_delete AFTER DELETE ON '
+    f'employees FOR EACH ROW {MYSQL_REMOVE.rstrip(";")}',
+    f'CREATE TRIGGER employees_counters_update AFTER UPDATE ON '
+    f'employees FOR EACH ROW BEGIN IF NOT (OLD.salary <=> NEW.salary '
+    f'AND OLD.department_id <=> NEW.department_id) THEN {MYSQL_REMOVE} '
+    f'{MYSQL_ADD} END IF; END',
+]
+DROP_TRIGGERS = [f'DROP TRIGGER IF EXISTS employees_counters_{action}'
+                 for action in ('insert', 'delete', 'update')]
+RECOUNT = 'UPDATE departments SET ' \
+          'headcount = (SELECT count(employees.id) FROM employees ' \
+          'WHERE employees.department_id = departments.id), ' \
+          'salary_sum = (SELECT coalesce(sum(employees.salary), 0) ' \
+          'FROM employees WHERE employees.department_id = departments.id)'
+
+
+def upgrade():
+    bind = op.get_bind()
+    # columns could be already created by db.create_all()
+    columns = [c['name'] for c in
+               sa.inspect(bind).get_columns('departments')]
+    if 'headcount' not in columns:
+        op.add_column('departments', sa.Column(
+            'headcount', sa.Integer(), server_default='0', nullable=False))
+    if 'salary_sum' not in columns:
+        op.add_column('departments', sa.Column(
+            'salary_sum', sa.Float(precision=53), server_default='0',
+            nullable=False))
+    # triggers are recreated, so counters are computed by them from now
+    # and by recount of existing employees before
+    for statement in DROP_TRIGGERS:
+        op.execute(statement)
+    if bind.dialect.name == 'sqlite':
+        statements = SQLITE_TRIGGERS
+    elif bind.dialect.name == 'mysql':
+        statements = MYSQL_TRIGGERS
+    else:
+        statements = []
+    for statement in statements:
+        op.execute(statement)
+    op.execute(RECOUNT)
+
+
+def downgrade():
+    for statement in DROP_TRIGGERS:
+        op.execute(statement)
+    with op.batch_alter_table('departments') as batch_op:
+        batch_op.drop_column('salary_sum')
+        batch_op.drop_column('headcount')
@@ -0,0 +1,31 @@
+"""department date of birth index
+
+Revision ID: 3d8b1f6c9e24
+Revises: 0c6e9b4d2a57
+Create Date: 2026-10-18 18:52:17.436091
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d8b1f6c9e24'
+down_revision = '0c6e9b4d2a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # index could be already created by db.create_all(),
+    # (department_id, salary) index is created by f4a7c2e9b316
+    indexes = sa.inspect(op.get_bind()).get_indexes('employees')
+    if 'ix_employees_department_id_date_of_birth' not in \
+            [i['name'] for i in indexes]:
+        op.create_index('ix_employees_department_id_date_of_birth',
+                        'employees', ['department_id', 'date_of_birth'])
+
+
+def downgrade():
+    op.drop_index('ix_employees_department_id_date_of_birth',
+                  table_name='employees')
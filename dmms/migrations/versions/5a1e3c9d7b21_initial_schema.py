@@ -0,0 +1,45 @@
+"""initial schema
+
+Revision ID: 5a1e3c9d7b21
+Revises: 
+Create Date: 2026-10-18 10:02:11.420113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a1e3c9d7b21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # tables could be already created by db.create_all()
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'departments' not in tables:
+        op.create_table(
+            'departments',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'employees' not in tables:
+        op.create_table(
+            'employees',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('date_of_birth', sa.String(length=255),
+                      nullable=False),
+            sa.Column('salary', sa.Float(), nullable=False),
+            sa.Column('department_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['department_id'], ['departments.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('employees')
+    op.drop_table('departments')
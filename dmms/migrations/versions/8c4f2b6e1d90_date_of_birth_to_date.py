@@ -0,0 +1,42 @@
+"""date_of_birth to date
+
+Revision ID: 8c4f2b6e1d90
+Revises: 5a1e3c9d7b21
+Create Date: 2026-10-18 10:14:37.051842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4f2b6e1d90'
+down_revision = '5a1e3c9d7b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing values are stored in ISO format (YYYY-MM-DD)
+    # so they are converted by database itself.
+    # SQLite has no separate date type and keeps ISO strings as they are,
+    # casting them while copying the table would break values
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('employees', 'date_of_birth',
+                        existing_type=sa.String(length=255),
+                        type_=sa.Date(),
+                        existing_nullable=False)
+    # index could be already created by db.create_all()
+    indexes = sa.inspect(op.get_bind()).get_indexes('employees')
+    if 'ix_employees_date_of_birth' not in [i['name'] for i in indexes]:
+        op.create_index('ix_employees_date_of_birth', 'employees',
+                        ['date_of_birth'])
+
+
+def downgrade():
+    op.drop_index('ix_employees_date_of_birth', table_name='employees')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('employees', 'date_of_birth',
+                        existing_type=sa.Date(),
+                        type_=sa.String(length=255),
+                        existing_nullable=False)
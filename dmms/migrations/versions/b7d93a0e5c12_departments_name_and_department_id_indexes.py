@@ -0,0 +1,38 @@
+"""departments name and department_id indexes
+
+Revision ID: b7d93a0e5c12
+Revises: 8c4f2b6e1d90
+Create Date: 2026-10-18 11:32:05.183964
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d93a0e5c12'
+down_revision = '8c4f2b6e1d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # indexes could be already created by db.create_all()
+    inspector = sa.inspect(op.get_bind())
+    departments_indexes = [i['name'] for i in
+                           inspector.get_indexes('departments')]
+    employees_indexes = [i['name'] for i in
+                         inspector.get_indexes('employees')]
+    # fails if there are departments with the same name,
+    # they have to be renamed before upgrade
+    if 'ix_departments_name' not in departments_indexes:
+        op.create_index('ix_departments_name', 'departments', ['name'],
+                        unique=True)
+    if 'ix_employees_department_id' not in employees_indexes:
+        op.create_index('ix_employees_department_id', 'employees',
+                        ['department_id'])
+
+
+def downgrade():
+    op.drop_index('ix_employees_department_id', table_name='employees')
+    op.drop_index('ix_departments_name', table_name='departments')
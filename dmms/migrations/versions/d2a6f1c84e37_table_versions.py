@@ -0,0 +1,35 @@
+"""table versions
+
+Revision ID: d2a6f1c84e37
+Revises: b7d93a0e5c12
+Create Date: 2026-10-18 13:48:22.610457
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6f1c84e37'
+down_revision = 'b7d93a0e5c12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # table could be already created by db.create_all()
+    if 'table_versions' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # rows are created beforehand so writes only update them
+    op.bulk_insert(table_versions, [{'name': 'departments', 'version': 0},
+                                    {'name': 'employees', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('table_versions')
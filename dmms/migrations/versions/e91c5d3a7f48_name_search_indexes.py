@@ -0,0 +1,85 @@
+"""name search indexes
+
+Revision ID: e91c5d3a7f48
+Revises: d2a6f1c84e37
+Create Date: 2026-10-18 15:06:41.372918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91c5d3a7f48'
+down_revision = 'd2a6f1c84e37'
+branch_labels = None
+depends_on = None
+
+TABLES = ('departments', 'employees')
+
+
+# DDL is kept here as it was at this revision, so later changes of app
+# don't change the migration
+def sqlite_index_ddl(name):
+    fts = f'{name}_fts'
+    remove = f"INSERT INTO {fts}({fts}, rowid, name) " \
+             f"VALUES ('delete', old.id, old.name);"
+    add = f'INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name);'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, "
+        f"content='{name}', content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {name} '
+        f'BEGIN {add} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {name} '
+        f'BEGIN {remove} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF name '
+        f'ON {name} BEGIN {remove} {add} END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_drop_ddl(name):
+    fts = f'{name}_fts'
+    return [f'DROP TRIGGER IF EXISTS {fts}_{action}'
+            for action in ('insert', 'delete', 'update')] + \
+        [f'DROP TABLE IF EXISTS {fts}']
+
+
+def mysql_index_ddl(name):
+    return [f'ALTER TABLE {name} ADD FULLTEXT INDEX ix_{name}_name_fulltext '
+            f'(name) WITH PARSER ngram']
+
+
+def mysql_drop_ddl(name):
+    return [f'ALTER TABLE {name} DROP INDEX ix_{name}_name_fulltext']
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # statements are idempotent and index is rebuilt from
+        # names which are already in table
+        for table in TABLES:
+            for statement in sqlite_index_ddl(table):
+                op.execute(statement)
+    elif bind.dialect.name == 'mysql':
+        # indexes could be already created by db.create_all()
+        inspector = sa.inspect(bind)
+        for table in TABLES:
+            indexes = [i['name'] for i in inspector.get_indexes(table)]
+            if f'ix_{table}_name_fulltext' not in indexes:
+                for statement in mysql_index_ddl(table):
+                    op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    for table in TABLES:
+        if bind.dialect.name == 'sqlite':
+            statements = sqlite_drop_ddl(table)
+        elif bind.dialect.name == 'mysql':
+            statements = mysql_drop_ddl(table)
+        else:
+            statements = []
+        for statement in statements:
+            op.execute(statement)
@@ -0,0 +1,34 @@
+"""salary indexes
+
+Revision ID: f4a7c2e9b316
+Revises: e91c5d3a7f48
+Create Date: 2026-10-18 16:21:09.845127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a7c2e9b316'
+down_revision = 'e91c5d3a7f48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # indexes could be already created by db.create_all()
+    inspector = sa.inspect(op.get_bind())
+    employees_indexes = [i['name'] for i in
+                         inspector.get_indexes('employees')]
+    if 'ix_employees_salary' not in employees_indexes:
+        op.create_index('ix_employees_salary', 'employees', ['salary'])
+    if 'ix_employees_department_id_salary' not in employees_indexes:
+        op.create_index('ix_employees_department_id_salary', 'employees',
+                        ['department_id', 'salary'])
+
+
+def downgrade():
+    op.drop_index('ix_employees_department_id_salary',
+                  table_name='employees')
+    op.drop_index('ix_employees_salary', table_name='employees')
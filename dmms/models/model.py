@@ -1,4 +1,11 @@
+from datetime import date
+
+from sqlalchemy.orm import validates
+
 from dmms.service.db import db
+from dmms.service.counters import add_counter_triggers
+from dmms.service.parsers import iso_date
+from dmms.service.search import add_search_index
 
 
 class DepartmentsModel(db.Model):
@@ -6,25 +13,62 @@ class DepartmentsModel(db.Model):
     __tablename__ = 'departments'
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(255), nullable=False)
+    name = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    # counters of employees kept by triggers of employees table,
+    # sum is double precision on MySQL too
+    headcount = db.Column(db.Integer, nullable=False, default=0,
+                          server_default='0')
+    salary_sum = db.Column(db.Float(precision=53), nullable=False,
+                           default=0, server_default='0')
     employees = db.relationship('EmployeesModel', backref='department')
 
     def __repr__(self):
         return f'<Department(id={self.id}, name={self.name})>'
 
 
+add_search_index(DepartmentsModel.__table__)
+
+
 class EmployeesModel(db.Model):
     """Model for Employees table"""
     __tablename__ = 'employees'
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
-    date_of_birth = db.Column(db.String(255), nullable=False)
-    salary = db.Column(db.Float, nullable=False)
+    date_of_birth = db.Column(db.Date, nullable=False, index=True)
+    salary = db.Column(db.Float, nullable=False, index=True)
     department_id = db.Column(db.Integer,
-                              db.ForeignKey('departments.id'))
+                              db.ForeignKey('departments.id'), index=True)
+    # employees of department are filtered by birthday or salary and
+    # salaries of department are read sorted from indexes
+    __table_args__ = (db.Index('ix_employees_department_id_salary',
+                               'department_id', 'salary'),
+                      db.Index('ix_employees_department_id_date_of_birth',
+                               'department_id', 'date_of_birth'))
+
+    @validates('date_of_birth')
+    def validate_date_of_birth(self, key: str, value) -> date:
+        """Convert date of birth passed as ISO formatted string to date"""
+        if isinstance(value, str):
+            return iso_date(value)
+        return value
 
     def __repr__(self):
         return f'<Employee(id={self.id}, name={self.name}, ' \
                f'date_of_birth={self.date_of_birth}, salary={self.salary},' \
                f'department_id={self.department_id})>'
+
+
+add_search_index(EmployeesModel.__table__)
+add_counter_triggers(EmployeesModel.__table__)
+
+
+class TableVersionsModel(db.Model):
+    """Model for versions of tables. Version is changed by every write"""
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TableVersion(name={self.name}, version={self.version})>'
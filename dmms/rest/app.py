@@ -2,24 +2,54 @@ import os
 from flask import Flask
 from flask_restful import Api
 
-from dmms.service.db import db, migrate
+from dmms.service.cache import ResponseCache
+from dmms.service.db import db, migrate, pool_config
 from dmms.service.config import run_config
-from dmms.service.resources import Departments, Employees
+from dmms.service.fields_structure import output_json
+from dmms.service.metrics import RequestMetrics
+from dmms.service.resources import (CacheStats, Departments,
+                                     DepartmentsSummary, Employees,
+                                     EmployeesExport, Health, SalaryStats)
+from dmms.service.salary_stats import SalaryColumns
 
 MIGRATION_DIR = os.path.join('migrations')
 
-app = Flask(__name__)
-app.config.from_object(run_config())
-db.init_app(app)
 
-with app.app_context():
-    db.create_all()
+def create_app(config=None) -> Flask:
+    """Create REST service app
 
-migrate.init_app(app, db, directory=MIGRATION_DIR)
+    Database isn't touched here, schema is created by manage.py create_db
+    or migrations.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config or run_config())
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+    db.init_app(app)
+    ResponseCache().init_app(app)
+    SalaryColumns().init_app(app)
+    RequestMetrics().init_app(app)
+    migrate.init_app(app, db, directory=MIGRATION_DIR)
 
-api = Api(app)
-api.add_resource(Departments, '/departments', '/departments/<department_id>')
-api.add_resource(Employees, '/employees', '/employees/<employee_id>')
+    # engine is created without connecting to database
+    with app.app_context():
+        app.logger.info('Database connection pool: %s',
+                        pool_config(db.engine))
+
+    api = Api(app)
+    api.representation('application/json')(output_json)
+    api.add_resource(Departments, '/departments',
+                     '/departments/<department_id>')
+    api.add_resource(DepartmentsSummary, '/departments/summary')
+    api.add_resource(Employees, '/employees', '/employees/<employee_id>')
+    api.add_resource(EmployeesExport, '/employees/export')
+    api.add_resource(SalaryStats, '/salary-stats',
+                     '/departments/<department_id>/salary-stats')
+    api.add_resource(CacheStats, '/cache')
+    api.add_resource(Health, '/health')
+    return app
+
+
+app = create_app()
 
 if __name__ == '__main__':
     app.run()
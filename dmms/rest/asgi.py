@@ -0,0 +1,236 @@
+"""Async variant of REST API reads
+
+GET /departments, /departments/summary and /employees are served through
+async database driver, all other requests are passed to WSGI app.
+Run with: uvicorn dmms.rest.asgi:app
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+from databases import Database
+from flask_restful import fields
+from sqlalchemy import select
+from starlette.applications import Starlette
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags
+
+from dmms.models.model import (DepartmentsModel, EmployeesModel,
+                               TableVersionsModel)
+from dmms.rest.app import app as wsgi_app
+from dmms.service.fields_structure import (compile_structure,
+                                           departments_serializer,
+                                           departments_short_serializer,
+                                           departments_summary_serializer,
+                                           employees_serializer,
+                                           employees_structure)
+from dmms.service.pagination import PageOrder, page_query, split_page
+from dmms.service.parsers import (department_get_schema,
+                                  department_summary_schema,
+                                  employee_get_schema)
+from dmms.service.resources import (departments_summary_query,
+                                    employees_query, employees_order)
+from dmms.service.search import search_filter, search_rank
+from dmms.service.versions import make_etag
+
+# department name is read by join into flat row of employee
+employees_department_name_serializer = compile_structure(
+    dict(employees_structure, department_name=fields.String))
+
+
+def async_database_uri(uri: str) -> str:
+    """Get URI of async driver for database of sync URI"""
+    # databases package selects async driver by dialect itself
+    dialect, rest = uri.split('://', 1)
+    return f'{dialect.split("+")[0]}://{rest}'
+
+
+def database_options(uri: str) -> dict:
+    """Get connection pool options of async database"""
+    options = wsgi_app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    # check if database has pool which can be tuned
+    if 'pool_size' not in options:
+        return {}
+    return {'min_size': 1,
+            'max_size': options['pool_size'] + options['max_overflow']}
+
+
+database = Database(
+    async_database_uri(wsgi_app.config['SQLALCHEMY_DATABASE_URI']),
+    **database_options(wsgi_app.config['SQLALCHEMY_DATABASE_URI']))
+
+
+class SyncContext:
+    """Flask request context with path and query of async request
+
+    Parsers, validation and query builders of service work in it the
+    same way as in WSGI app. It mustn't be kept over await.
+    """
+    def __init__(self, request: Request):
+        self.context = wsgi_app.test_request_context(
+            request.url.path, query_string=request.url.query,
+            base_url=f'{request.url.scheme}://{request.url.netloc}',
+            headers=list(request.headers.items()))
+
+    def __enter__(self):
+        self.context.push()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.context.pop()
+
+
+async def fetch_dicts(statement: Any) -> List[dict]:
+    """Fetch rows of statement as dicts"""
+    return [dict(row) for row in await database.fetch_all(statement)]
+
+
+async def conditional_read(request: Request, name: str, args: dict,
+                           tables: List[str],
+                           read: Callable) -> Response:
+    """Get response of read request using ETag of tables versions"""
+    versions = dict(await database.fetch_all(
+        select([TableVersionsModel.name, TableVersionsModel.version]).where(
+            TableVersionsModel.name.in_(tables))))
+    versions = {table: versions.get(table, 0) for table in sorted(tables)}
+    etag = make_etag(name, args, versions)
+    # list of tags, * and weak tags are matched the same way as in WSGI app
+    if parse_etags(request.headers.get('If-None-Match')).contains_weak(etag):
+        return Response(status_code=304, headers={'ETag': f'"{etag}"'})
+    data, headers = await read()
+    return JSONResponse(data, headers=dict(headers, ETag=f'"{etag}"'))
+
+
+def error_response(error: HTTPException) -> JSONResponse:
+    """Convert abort of parser or validation to JSON response"""
+    data = getattr(error, 'data', {'message': error.description})
+    return JSONResponse(data, status_code=error.code)
+
+
+async def departments(request: Request) -> Response:
+    """Get all departments or some departments by id or name"""
+    with SyncContext(request):
+        try:
+            args = department_get_schema.parse_args()
+        except HTTPException as error:
+            return error_response(error)
+        query = DepartmentsModel.query.with_entities(DepartmentsModel.id,
+                                                     DepartmentsModel.name)
+        rank = None
+        if args.get('name'):
+            query = query.filter(DepartmentsModel.name == args['name'])
+            statement, limit = query.limit(1).statement, None
+        else:
+            if args.get('id'):
+                query = query.filter(DepartmentsModel.id.in_(args['id']))
+            if args.get('q'):
+                query = query.filter(
+                    search_filter(DepartmentsModel, args['q']))
+                rank = PageOrder('rank',
+                                 search_rank(DepartmentsModel, args['q']))
+            try:
+                query, limit = page_query(query, DepartmentsModel.id, args,
+                                          rank)
+            except HTTPException as error:
+                return error_response(error)
+            statement = query.statement
+    if args['include'] == 'none':
+        tables = ['departments']
+        serializer = departments_short_serializer
+    else:
+        tables = ['departments', 'employees']
+        serializer = departments_serializer
+
+    async def read() -> Tuple[Any, Dict[str, str]]:
+        rows = await fetch_dicts(statement)
+        headers = {}
+        if limit is not None:
+            with SyncContext(request):
+                rows, headers = split_page(rows, limit, args, rank)
+        # employees of all departments of page are read by one query
+        if args['include'] != 'none' and rows:
+            employees = {row['id']: [] for row in rows}
+            employees_rows = await fetch_dicts(
+                select([EmployeesModel.__table__]).where(
+                    EmployeesModel.department_id.in_(list(employees))
+                ).order_by(EmployeesModel.id))
+            for employee in employees_rows:
+                employees[employee['department_id']].append(employee)
+            for row in rows:
+                row['employees'] = employees[row['id']]
+        if limit is None:
+            return serializer(rows[0] if rows else None), headers
+        return serializer(rows), headers
+    return await conditional_read(request, 'departments', args, tables, read)
+
+
+async def departments_summary(request: Request) -> Response:
+    """Get headcount and salary aggregates of all departments"""
+    with SyncContext(request):
+        try:
+            args = department_summary_schema.parse_args()
+        except HTTPException as error:
+            return error_response(error)
+        query, limit = page_query(departments_summary_query(),
+                                  DepartmentsModel.id, args)
+
+    async def read() -> Tuple[Any, Dict[str, str]]:
+        rows = await fetch_dicts(query.statement)
+        with SyncContext(request):
+            rows, headers = split_page(rows, limit)
+        return departments_summary_serializer(rows), headers
+    return await conditional_read(request, 'departments_summary', args,
+                                  ['departments', 'employees'], read)
+
+
+async def employees(request: Request) -> Response:
+    """Get employees filtered and sorted by args of request"""
+    with SyncContext(request):
+        try:
+            args = employee_get_schema.parse_args()
+        except HTTPException as error:
+            return error_response(error)
+        query = employees_query(args)
+        if args['include'] == 'department_name':
+            tables = ['employees', 'departments']
+            serializer = employees_department_name_serializer
+            query = query.outerjoin(EmployeesModel.department).add_columns(
+                DepartmentsModel.name.label('department_name'))
+        else:
+            tables = ['employees']
+            serializer = employees_serializer
+        order = employees_order(args)
+        try:
+            query, limit = page_query(query, EmployeesModel.id, args, order)
+        except HTTPException as error:
+            return error_response(error)
+
+    async def read() -> Tuple[Any, Dict[str, str]]:
+        rows = await fetch_dicts(query.statement)
+        with SyncContext(request):
+            rows, headers = split_page(rows, limit, args, order)
+        return serializer(rows), headers
+    return await conditional_read(request, 'employees', args, tables, read)
+
+
+def wsgi_fallback(environ: dict, start_response: Callable):
+    """Pass request to WSGI app as if it was sent to its server name"""
+    # WSGI app doesn't match routes for hosts other than SERVER_NAME
+    if wsgi_app.config['SERVER_NAME']:
+        environ['HTTP_HOST'] = wsgi_app.config['SERVER_NAME']
+    return wsgi_app(environ, start_response)
+
+
+app = Starlette(
+    routes=[
+        Route('/departments', departments, methods=['GET']),
+        Route('/departments/summary', departments_summary, methods=['GET']),
+        Route('/employees', employees, methods=['GET']),
+        # writes and other requests are served by WSGI app
+        Mount('/', WSGIMiddleware(wsgi_fallback)),
+    ],
+    on_startup=[database.connect],
+    on_shutdown=[database.disconnect],
+)
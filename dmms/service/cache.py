@@ -0,0 +1,157 @@
+import json
+import pickle
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+
+class LRUBackend:
+    """In-process cache which drops least recently used entries
+
+    Entries expire after ttl seconds.
+    """
+    name = 'lru'
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value by key"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Set value by key"""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def size(self) -> int:
+        """Get number of entries"""
+        with self.lock:
+            return len(self.entries)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self.lock:
+            self.entries.clear()
+
+
+class RedisBackend:
+    """Cache in Redis or Redis-compatible server shared by all workers"""
+    name = 'redis'
+
+    def __init__(self, url: str, ttl: float):
+        # redis is optional dependency needed only by this backend
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('Please install redis package to use '
+                               'redis cache backend')
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value by key"""
+        value = self.client.get(f'cache:{key}')
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Set value by key"""
+        self.client.set(f'cache:{key}', pickle.dumps(value),
+                        ex=max(int(self.ttl), 1))
+
+    def size(self) -> int:
+        """Get number of entries"""
+        # database can be shared with other applications, so only keys
+        # of cache are counted
+        return sum(1 for _ in self.client.scan_iter('cache:*'))
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        for key in self.client.scan_iter('cache:*'):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    """Cache of GET responses keyed by parsed request arguments
+
+    Every entry depends on versions of tables it was read from.
+    Write to a table increments its version, so all entries read
+    from it are not used anymore. Each app has its own cache in
+    app.extensions.
+    """
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        # counters are changed by all threads of worker
+        self.lock = Lock()
+
+    def init_app(self, app) -> None:
+        """Create cache backend selected in app config"""
+        app.extensions['response_cache'] = self
+        backend = app.config['CACHE_BACKEND']
+        if backend == 'lru':
+            self.backend = LRUBackend(app.config['CACHE_MAX_SIZE'],
+                                      app.config['CACHE_TTL'])
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'],
+                                        app.config['CACHE_TTL'])
+        else:
+            self.backend = None
+
+    @staticmethod
+    def key(name: str, args: dict, versions: Dict[str, int]) -> str:
+        """Build key from name, normalized args and tables versions"""
+        normalized = json.dumps(args, sort_keys=True, default=str)
+        versions = ','.join(f'{table}:{version}' for table, version
+                            in sorted(versions.items()))
+        return f'{name}|{versions}|{normalized}'
+
+    def get_or_set(self, name: str, args: dict, versions: Dict[str, int],
+                   compute: Callable[[], Any]) -> Any:
+        """Get cached response or compute and cache it"""
+        if self.backend is None:
+            return compute()
+        key = self.key(name, args, versions)
+        response = self.backend.get(key)
+        if response is not None:
+            with self.lock:
+                self.hits += 1
+            return response
+        with self.lock:
+            self.misses += 1
+        response = compute()
+        self.backend.set(key, response)
+        return response
+
+    def stats(self) -> dict:
+        """Get cache hit and miss counters"""
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        return {'backend': self.backend.name if self.backend else None,
+                'size': self.backend.size() if self.backend else 0,
+                'hits': hits,
+                'misses': misses}
+
+
+# cache of current app
+response_cache = LocalProxy(lambda: current_app.extensions['response_cache'])
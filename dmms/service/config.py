@@ -1,17 +1,77 @@
 import os
+import tempfile
+from typing import Optional
+
+
+def optional_float(name: str, default: float) -> Optional[float]:
+    """Get number from environment, empty value or 'none' gives None"""
+    value = os.environ.get(name, str(default))
+    if value.strip().lower() in ('', 'none'):
+        return None
+    return float(value)
 
 
 class Config:
     """Default configuration"""
     DEBUG = False
-    SERVER_NAME = 'localhost:5000'
+    # empty SERVER_NAME lets app answer on any host, e.g. behind proxy
+    SERVER_NAME = os.environ.get('SERVER_NAME', 'localhost:5000') or None
     MYSQL_USER = 'manager_user'
     MYSQL_PASSWORD = 'hard_password1234'
     MYSQL_HOST = 'localhost'
+    # 'mysqldb' (mysqlclient) or 'pymysql'
+    MYSQL_DRIVER = os.environ.get('MYSQL_DRIVER', 'mysqldb')
     DB_NAME = 'company_db'
-    SQLALCHEMY_DATABASE_URI = f'mysql://{MYSQL_USER}:{MYSQL_PASSWORD}' \
+    SQLALCHEMY_DATABASE_URI = f'mysql+{MYSQL_DRIVER}://' \
+                              f'{MYSQL_USER}:{MYSQL_PASSWORD}' \
                               f'@{MYSQL_HOST}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # effective database pool configuration is logged at INFO level
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    # queries running longer are logged with their parameters,
+    # None (SLOW_QUERY_MS=none) disables the log
+    SLOW_QUERY_MS = optional_float('SLOW_QUERY_MS', 500)
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 1000
+    # number of buckets of salary histogram if it isn't requested
+    SALARY_HISTOGRAM_BUCKETS = 10
+    MAX_SALARY_HISTOGRAM_BUCKETS = 100
+    # seconds sorted salaries read for statistics are kept in memory
+    # unless employees are changed, 0 reads them for every request
+    SALARY_COLUMNS_TTL = 60
+    # serialize responses with orjson when it is installed, its output
+    # has no spaces after separators unlike standard json
+    ORJSON_RESPONSES = os.environ.get('ORJSON_RESPONSES',
+                                      'false').lower() == 'true'
+    # max number of items created by one bulk request
+    MAX_BATCH_SIZE = 1000
+    # number of rows inserted by one statement of bulk create, SQLite
+    # before 3.32 allows only 999 parameters in statement
+    BULK_INSERT_CHUNK_SIZE = 200
+    # number of ids in one statement of bulk update and delete
+    BULK_CHUNK_SIZE = 500
+    # number of rows fetched at once from server-side cursor of export
+    EXPORT_CHUNK_SIZE = 1000
+    # number of rows inserted by one statement of manage.py import
+    IMPORT_BATCH_SIZE = 1000
+    # use LOAD DATA LOCAL INFILE for import of employees on MySQL,
+    # local_infile must be enabled on server
+    IMPORT_LOAD_DATA = True
+    # cache of GET responses: 'lru', 'redis' or 'none'
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'lru')
+    CACHE_MAX_SIZE = 1024
+    CACHE_TTL = 60
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL',
+                                     'redis://localhost:6379/0')
+    # how employees of departments are loaded: 'selectin' or 'joined'
+    DEPARTMENTS_EMPLOYEES_LOADING = 'selectin'
+    # how views app gets data from REST service:
+    # 'local' - calls service resources in the same process,
+    # 'http' - sends requests to REST_API_URL
+    VIEWS_CLIENT_BACKEND = os.environ.get('VIEWS_CLIENT_BACKEND', 'http')
+    REST_API_URL = os.environ.get('REST_API_URL', 'http://localhost:5000')
+    REST_API_TIMEOUT = 5
+    REST_API_POOL_SIZE = 10
 
 
 class DevConfig(Config):
@@ -21,17 +81,62 @@ class DevConfig(Config):
 
 class TestConfig(Config):
     """Test configuration"""
+    SERVER_NAME = 'localhost:5000'
     DB_NAME = 'test_company_db'
-    SQLALCHEMY_DATABASE_URI = f'mysql://{Config.MYSQL_USER}:' \
+    SQLALCHEMY_DATABASE_URI = f'mysql+{Config.MYSQL_DRIVER}://' \
+                              f'{Config.MYSQL_USER}:' \
                               f'{Config.MYSQL_PASSWORD}' \
                               f'@{Config.MYSQL_HOST}/{DB_NAME}'
+    # tests fill tables directly, so responses aren't cached by default
+    CACHE_BACKEND = 'none'
+    SALARY_COLUMNS_TTL = 0
+
+
+class SqliteConfig(Config):
+    """Local configuration with SQLite database file"""
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'SQLITE_DATABASE_URI',
+        f'sqlite:///{tempfile.gettempdir()}/dmms.db')
+
+
+class BenchmarkConfig(SqliteConfig):
+    """Benchmark configuration"""
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'BENCHMARK_DATABASE_URI',
+        f'sqlite:///{tempfile.gettempdir()}/dmms_benchmark.db')
+    # benchmarks measure reading from database, not from cache
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'none')
+
+
+def engine_options(uri: str) -> dict:
+    """Build engine and connection pool options from environment"""
+    # SQLite opens file on each connect, so its pool isn't tuned
+    if uri.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        # connections are renewed before MySQL wait_timeout closes them
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 3600)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING',
+                                        'true').lower() == 'true',
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    }
 
 
 def run_config():
     """Select which configuration to use"""
     env = os.environ.get('ENV')
     if env == 'DEV':
-        return DevConfig
+        config = DevConfig
     elif env == 'TEST':
-        return TestConfig
-    return Config
+        config = TestConfig
+    elif env == 'BENCHMARK':
+        config = BenchmarkConfig
+    elif env == 'SQLITE':
+        config = SqliteConfig
+    else:
+        config = Config
+    config.SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        config.SQLALCHEMY_DATABASE_URI)
+    return config
@@ -0,0 +1,105 @@
+from typing import Any, List, Tuple
+
+from sqlalchemy import DDL, event, func, or_, select
+
+from dmms.service.db import db
+
+TRIGGERS = ('insert', 'delete', 'update')
+# salary sum changed by many additions and subtractions can differ
+# from sum of salaries by rounding error
+SALARY_SUM_TOLERANCE = 0.01
+
+# statements changing counters of department of new and old employee row
+ADD_NEW = 'UPDATE departments SET headcount = headcount + 1, ' \
+          'salary_sum = salary_sum + {new}.salary ' \
+          'WHERE id = {new}.department_id;'
+REMOVE_OLD = 'UPDATE departments SET headcount = headcount - 1, ' \
+             'salary_sum = salary_sum - {old}.salary ' \
+             'WHERE id = {old}.department_id;'
+
+
+def sqlite_counters_ddl() -> List[str]:
+    """Get statements creating triggers of counters on SQLite"""
+    add, remove = ADD_NEW.format(new='new'), REMOVE_OLD.format(old='old')
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS employees_counters_insert '
+        f'AFTER INSERT ON employees BEGIN {add} END',
+        f'CREATE TRIGGER IF NOT EXISTS employees_counters_delete '
+        f'AFTER DELETE ON employees BEGIN {remove} END',
+        f'CREATE TRIGGER IF NOT EXISTS employees_counters_update '
+        f'AFTER UPDATE OF salary, department_id ON employees '
+        f'BEGIN {remove} {add} END',
+    ]
+
+
+def mysql_counters_ddl() -> List[str]:
+    """Get statements creating triggers of counters on MySQL"""
+    add, remove = ADD_NEW.format(new='NEW'), REMOVE_OLD.format(old='OLD')
+    # update trigger fires for every column, so counters are changed
+    # only if salary or department of employee is changed
+    return [
+        f'CREATE TRIGGER employees_counters_insert AFTER INSERT ON '
+        f'employees FOR EACH ROW {add.rstrip(";")}',
+        f'CREATE TRIGGER employees_counters_delete AFTER DELETE ON '
+        f'employees FOR EACH ROW {remove.rstrip(";")}',
+        f'CREATE TRIGGER employees_counters_update AFTER UPDATE ON '
+        f'employees FOR EACH ROW BEGIN IF NOT (OLD.salary <=> NEW.salary '
+        f'AND OLD.department_id <=> NEW.department_id) THEN {remove} '
+        f'{add} END IF; END',
+    ]
+
+
+def counters_drop_ddl() -> List[str]:
+    """Get statements dropping triggers of counters"""
+    return [f'DROP TRIGGER IF EXISTS employees_counters_{action}'
+            for action in TRIGGERS]
+
+
+def add_counter_triggers(target: Any) -> None:
+    """Create triggers of department counters together with employees"""
+    # triggers are dropped together with table
+    for statement in sqlite_counters_ddl():
+        event.listen(target, 'after_create',
+                     DDL(statement).execute_if(dialect='sqlite'))
+    for statement in mysql_counters_ddl():
+        event.listen(target, 'after_create',
+                     DDL(statement).execute_if(dialect='mysql'))
+
+
+def department_totals() -> Tuple[Any, Any]:
+    """Get headcount and salary sum of department counted by employees"""
+    departments = db.metadata.tables['departments']
+    employees = db.metadata.tables['employees']
+    of_department = employees.c.department_id == departments.c.id
+    headcount = select([func.count(employees.c.id)]).where(of_department)
+    salary_sum = select([func.coalesce(func.sum(employees.c.salary), 0)]
+                        ).where(of_department)
+    return headcount.as_scalar(), salary_sum.as_scalar()
+
+
+def recount_statement() -> Any:
+    """Get statement recomputing counters of all departments"""
+    departments = db.metadata.tables['departments']
+    headcount, salary_sum = department_totals()
+    return departments.update().values(headcount=headcount,
+                                       salary_sum=salary_sum)
+
+
+def recount() -> int:
+    """Recompute counters of all departments, get number of departments"""
+    return db.session.execute(recount_statement()).rowcount
+
+
+def wrong_counters() -> List[dict]:
+    """Get departments whose counters differ from their employees"""
+    departments = db.metadata.tables['departments']
+    headcount, salary_sum = department_totals()
+    rows = db.session.execute(select([
+        departments.c.id, departments.c.name, departments.c.headcount,
+        departments.c.salary_sum, headcount.label('actual_headcount'),
+        salary_sum.label('actual_salary_sum')
+    ]).where(or_(
+        departments.c.headcount != headcount,
+        func.abs(departments.c.salary_sum - salary_sum) >
+        SALARY_SUM_TOLERANCE)).order_by(departments.c.id))
+    return [dict(row) for row in rows]
@@ -1,5 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 migrate = Migrate()
+
+
+def pool_config(engine: Engine) -> dict:
+    """Get effective configuration of engine connection pool"""
+    pool = engine.pool
+    config = {'driver': engine.driver, 'pool': type(pool).__name__}
+    # only queue pools have size and overflow
+    if hasattr(pool, 'size') and hasattr(pool, '_max_overflow'):
+        config.update(size=pool.size(), max_overflow=pool._max_overflow,
+                      timeout=pool._timeout)
+    config.update(recycle=pool._recycle, pre_ping=pool._pre_ping)
+    return config
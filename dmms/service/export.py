@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator
+
+# columns of exported employees in the same order as employees_structure
+EMPLOYEES_EXPORT_COLUMNS = ('id', 'name', 'date_of_birth', 'salary',
+                            'department_id')
+
+
+def export_value(value: Any) -> Any:
+    """Convert value to the same form as in JSON responses"""
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def ndjson_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    """Convert rows to lines of newline delimited JSON"""
+    for row in rows:
+        item = {column: export_value(value) for column, value
+                in zip(EMPLOYEES_EXPORT_COLUMNS, row)}
+        yield json.dumps(item) + '\n'
+
+
+def csv_lines(rows: Iterable[tuple], chunk_size: int) -> Iterator[str]:
+    """Convert rows to CSV with header, by chunks of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EMPLOYEES_EXPORT_COLUMNS)
+    for number, row in enumerate(rows, start=1):
+        writer.writerow([export_value(value) for value in row])
+        if number % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
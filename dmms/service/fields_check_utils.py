@@ -1,4 +1,5 @@
 from typing import Any, Iterable
+from flask import current_app
 from flask_restful import abort
 
 
@@ -30,7 +31,7 @@ def value_is_positive(keys: Iterable[str], args: dict) -> None:
         if args[key] and args[key] <= 0:
             abort(406, message=f'Please provide higher then zero value '
                                f'for {key}')
-        return None
+    return None
 
 
 def value_provided(value: Any, operation: str) -> None:
@@ -45,3 +46,21 @@ def not_wrong_url(value) -> None:
     if value:
         abort(404, message='Page not found')
     return None
+
+
+def batch_size_is_allowed(items: list) -> None:
+    """Check if number of items is between one and allowed maximum"""
+    if not items:
+        abort(400, message='Please provide at least one item')
+    max_size = current_app.config['MAX_BATCH_SIZE']
+    if len(items) > max_size:
+        abort(413, message=f'Please provide not more than {max_size} '
+                           f'items')
+    return None
+
+
+def item_is_object(item: Any) -> None:
+    """Check if item of JSON array is object"""
+    if not isinstance(item, dict):
+        abort(400, message='Please provide item as JSON object')
+    return None
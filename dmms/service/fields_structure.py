@@ -1,4 +1,15 @@
+from functools import partial
+from typing import Any, Callable, List, Tuple
+
+from flask import current_app, make_response
 from flask_restful import fields
+from flask_restful.representations.json import output_json as default_json
+
+# orjson is optional dependency, standard json is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 employees_structure = {
@@ -9,8 +20,127 @@ employees_structure = {
     'department_id': fields.Integer
 }
 
+employees_department_structure = dict(
+    employees_structure,
+    department_name=fields.String(attribute='department.name')
+)
+
+departments_short_structure = {
+    'id': fields.Integer,
+    'name': fields.String
+}
+
 departments_structure = {
     'id': fields.Integer,
     'name': fields.String,
     'employees': fields.Nested(employees_structure)
 }
+
+departments_summary_structure = {
+    'id': fields.Integer,
+    'name': fields.String,
+    'headcount': fields.Integer,
+    'salary_sum': fields.Float,
+    'salary_avg': fields.Float,
+    'salary_min': fields.Float,
+    'salary_max': fields.Float
+}
+
+
+def object_getter(attribute: str) -> Callable[[Any], Any]:
+    """Get function reading attribute of ORM object or row tuple"""
+    # missing attributes give default of field like in marshal
+    if '.' not in attribute:
+        return lambda row: getattr(row, attribute, None)
+    names = attribute.split('.')
+
+    def get_path(row):
+        for name in names:
+            row = getattr(row, name, None)
+        return row
+    return get_path
+
+
+def mapping_getter(attribute: str) -> Callable[[dict], Any]:
+    """Get function reading key of dict"""
+    names = attribute.split('.')
+
+    def get_path(row):
+        for name in names:
+            row = row.get(name) if row is not None else None
+        return row
+    return get_path
+
+
+def field_formatter(field: fields.Raw) -> Callable[[Any], Any]:
+    """Get function formatting value the same way as field"""
+    default = field.default
+    if type(field) is fields.Integer:
+        return lambda value: default if value is None else int(value)
+    if type(field) is fields.Float:
+        return lambda value: default if value is None else float(value)
+    if type(field) is fields.String:
+        return lambda value: default if value is None else str(value)
+    if type(field) is fields.Nested:
+        nested = compile_structure(field.nested)
+        if field.allow_null:
+            return lambda value: None if value is None else nested(value)
+        if default is not None:
+            return lambda value: default if value is None else nested(value)
+        return nested
+    return None
+
+
+def compile_structure(structure: dict) -> Callable[[Any], Any]:
+    """Compile structure once into function converting rows to dicts
+
+    The result is the same as marshal(data, structure) for ORM objects,
+    row tuples, dicts and lists of them.
+    """
+    object_getters: List[Tuple[str, Callable, Callable]] = []
+    mapping_getters: List[Tuple[str, Callable, Callable]] = []
+    for key, field in structure.items():
+        if isinstance(field, type):
+            field = field()
+        attribute = field.attribute or key
+        formatter = field_formatter(field)
+        # check if field has no fast path, then it formats itself
+        if formatter is None or not isinstance(attribute, str):
+            output = partial(field.output, key)
+            object_getters.append((key, output, None))
+            mapping_getters.append((key, output, None))
+            continue
+        object_getters.append((key, object_getter(attribute), formatter))
+        mapping_getters.append((key, mapping_getter(attribute), formatter))
+
+    def convert_row(row):
+        getters = mapping_getters if isinstance(row, dict) \
+            else object_getters
+        return {key: formatter(get(row)) if formatter else get(row)
+                for key, get, formatter in getters}
+
+    def convert(data):
+        if isinstance(data, list):
+            return [convert_row(row) for row in data]
+        return convert_row(data)
+    return convert
+
+
+def output_json(data: Any, code: int, headers: dict = None):
+    """Make JSON response with orjson when it is installed and enabled"""
+    # indent and other settings are supported by standard json only
+    if orjson is None or not current_app.config['ORJSON_RESPONSES'] or \
+            current_app.debug or current_app.config.get('RESTFUL_JSON'):
+        return default_json(data, code, headers)
+    response = make_response(orjson.dumps(data) + b'\n', code)
+    response.headers.extend(headers or {})
+    return response
+
+
+employees_serializer = compile_structure(employees_structure)
+employees_department_serializer = compile_structure(
+    employees_department_structure)
+departments_short_serializer = compile_structure(departments_short_structure)
+departments_serializer = compile_structure(departments_structure)
+departments_summary_serializer = compile_structure(
+    departments_summary_structure)
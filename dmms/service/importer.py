@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+
+from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.db import db
+from dmms.service.parsers import iso_date
+from dmms.service.versions import bump_version, write_versions
+
+# columns of employees in files loaded with LOAD DATA LOCAL INFILE
+LOAD_DATA_COLUMNS = ('name', 'date_of_birth', 'salary', 'department_id')
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Read records of CSV or NDJSON file one by one"""
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def batches(records: Iterable, size: int) -> Iterator[list]:
+    """Split records to lists of given size"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def department_ids() -> Dict[str, int]:
+    """Get ids of all departments by their names"""
+    return dict(db.session.query(DepartmentsModel.name, DepartmentsModel.id))
+
+
+def employee_row(record: dict, departments: Dict[str, int]) -> dict:
+    """Convert record of employee to row of employees table"""
+    department_id = record.get('department_id')
+    # check if department is given by name instead of id
+    if not department_id and record.get('department'):
+        try:
+            department_id = departments[record['department']]
+        except KeyError:
+            raise ValueError(f'Department {record["department"]} '
+                             f'doesn\'t exist')
+    salary = float(record['salary'])
+    if salary <= 0:
+        raise ValueError(f'Salary of {record["name"]} must be positive')
+    return {'name': record['name'],
+            'date_of_birth': iso_date(str(record['date_of_birth'])),
+            'salary': salary,
+            'department_id': int(department_id) if department_id else None}
+
+
+def import_departments(path: str, batch_size: int) -> int:
+    """Insert departments which don't exist yet, return number of rows"""
+    existing = set(department_ids())
+    count = 0
+    for batch in batches(read_records(path), batch_size):
+        rows = []
+        for record in batch:
+            # check if department is new
+            if record['name'] not in existing:
+                existing.add(record['name'])
+                rows.append({'name': record['name']})
+        if rows:
+            db.session.execute(DepartmentsModel.__table__.insert(), rows)
+            count += len(rows)
+    bump_version(DepartmentsModel.__tablename__)
+    db.session.commit()
+    return count
+
+
+def load_data_value(value: Any) -> Any:
+    """Convert value of row to field of file loaded by LOAD DATA"""
+    if value is None:
+        return r'\N'
+    # backslash is escape character of LOAD DATA, so it's doubled in
+    # values and only NULL is written as \N
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\')
+    return value
+
+
+def load_data_local(rows: Iterator[dict]) -> int:
+    """Load employees with LOAD DATA LOCAL INFILE, return number of rows
+
+    Load runs on its own connection, version of employees is bumped
+    after its transaction is committed. It isn't a part of transaction
+    of session, so rows are kept even if session is rolled back later.
+    """
+    count = 0
+    file = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='',
+                                       delete=False)
+    try:
+        with file:
+            writer = csv.writer(file)
+            for row in rows:
+                writer.writerow([load_data_value(row[column])
+                                 for column in LOAD_DATA_COLUMNS])
+                count += 1
+        engine = create_engine(db.engine.url,
+                               connect_args={'local_infile': 1})
+        try:
+            with engine.begin() as connection:
+                connection.execute(
+                    f"LOAD DATA LOCAL INFILE '{file.name}' "
+                    f"INTO TABLE {EmployeesModel.__tablename__} "
+                    f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    f"LINES TERMINATED BY '\\r\\n' "
+                    f"({', '.join(LOAD_DATA_COLUMNS)})")
+            write_versions([EmployeesModel.__tablename__])
+        finally:
+            engine.dispose()
+    finally:
+        os.remove(file.name)
+    return count
+
+
+def import_employees(path: str, batch_size: int,
+                     load_data: bool = True) -> int:
+    """Insert employees, return number of rows"""
+    departments = department_ids()
+    rows = (employee_row(record, departments)
+            for record in read_records(path))
+    # check if bulk load path of MySQL can be used
+    if load_data and db.engine.dialect.name == 'mysql':
+        return load_data_local(rows)
+    count = 0
+    for batch in batches(rows, batch_size):
+        db.session.execute(EmployeesModel.__table__.insert(), batch)
+        count += len(batch)
+    bump_version(EmployeesModel.__tablename__)
+    db.session.commit()
+    return count
+
+
+def import_files(departments: Optional[str], employees: Optional[str],
+                 batch_size: int, load_data: bool = True
+                 ) -> List[Tuple[str, int, float]]:
+    """Import files, return table, number of rows and seconds for each"""
+    report = []
+    if departments:
+        start = time.perf_counter()
+        count = import_departments(departments, batch_size)
+        report.append(('departments', count, time.perf_counter() - start))
+    if employees:
+        start = time.perf_counter()
+        count = import_employees(employees, batch_size, load_data)
+        report.append(('employees', count, time.perf_counter() - start))
+    return report
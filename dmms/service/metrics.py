@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from flask import Response, current_app, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# upper bounds of latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+# longest text of parameters of query written to slow query log
+MAX_LOGGED_PARAMETERS = 500
+# key of counters of request in its WSGI environ
+ENVIRON_KEY = 'dmms.request_counters'
+# counters of requests handled by each thread, shared by all apps
+active = threading.local()
+
+
+class Histogram:
+    """Cumulative histogram of observed values"""
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add value to buckets it fits in"""
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+class RequestCounters:
+    """Start time, query count and database time of one request"""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+
+
+def active_requests() -> List[RequestCounters]:
+    """Get counters of requests handled by current thread"""
+    if not hasattr(active, 'requests'):
+        active.requests = []
+    return active.requests
+
+
+def start_request() -> None:
+    """Start counters of request"""
+    counters = RequestCounters()
+    request.environ[ENVIRON_KEY] = counters
+    active_requests().append(counters)
+
+
+def clear_request(error=None) -> None:
+    """Stop counting queries of request"""
+    counters = request.environ.pop(ENVIRON_KEY, None)
+    # check if counters were started by this request, not by outer
+    if counters is not None:
+        active_requests().remove(counters)
+
+
+def start_query(conn, cursor, statement, parameters, context,
+                executemany) -> None:
+    """Remember start time of query"""
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def logged_parameters(parameters: Any) -> str:
+    """Get shortened text of query parameters for slow query log"""
+    # executemany gets all rows, only first of them is logged
+    rows = None
+    if isinstance(parameters, (list, tuple)) and parameters and \
+            isinstance(parameters[0], (dict, list, tuple)):
+        rows, parameters = len(parameters), parameters[0]
+    text = repr(parameters)
+    if len(text) > MAX_LOGGED_PARAMETERS:
+        text = f'{text[:MAX_LOGGED_PARAMETERS]}...'
+    if rows is not None:
+        text = f'{text} ... ({rows} rows)'
+    return text
+
+
+def finish_query(conn, cursor, statement, parameters, context,
+                 executemany) -> None:
+    """Add query to request counters and log it if it's slow"""
+    duration = time.perf_counter() - conn.info['query_start'].pop()
+    for counters in active_requests():
+        counters.queries += 1
+        counters.db_time += duration
+    if not has_app_context():
+        return
+    threshold = current_app.config.get('SLOW_QUERY_MS')
+    if threshold is not None and duration * 1000 >= threshold:
+        current_app.logger.warning('Slow query (%.1f ms): %s %s',
+                                   duration * 1000, statement,
+                                   logged_parameters(parameters))
+
+
+def fail_query(context) -> None:
+    """Forget start time of query which raised error"""
+    # check if error was raised by started query, not by connect
+    if context.connection is not None and \
+            context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
+
+
+class RequestMetrics:
+    """Query count, database time and latency of requests of app
+
+    Counters of request are kept in its environ. Query is added to all
+    requests handled by thread, so queries of resources called
+    in-process by views are added to the views request, and request
+    context of resource doesn't reset counters of views request.
+    Each app has its own metrics in app.extensions.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency: Dict[tuple, Histogram] = {}
+        self.queries: Dict[tuple, int] = defaultdict(int)
+        self.db_time: Dict[tuple, float] = defaultdict(float)
+
+    def init_app(self, app) -> None:
+        """Register request hooks, SQL events and /metrics endpoint"""
+        app.extensions['request_metrics'] = self
+        app.before_request(start_request)
+        app.after_request(self.finish_request)
+        app.teardown_request(clear_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+        if not event.contains(Engine, 'before_cursor_execute', start_query):
+            event.listen(Engine, 'before_cursor_execute', start_query)
+            event.listen(Engine, 'after_cursor_execute', finish_query)
+            event.listen(Engine, 'handle_error', fail_query)
+
+    def finish_request(self, response: Response) -> Response:
+        """Add timing headers to response and record latency"""
+        counters = request.environ.get(ENVIRON_KEY)
+        # check if request was stopped before counters were started
+        if counters is None:
+            return response
+        duration = time.perf_counter() - counters.start
+        queries = counters.queries
+        db_time = counters.db_time
+        response.headers['X-Query-Count'] = str(queries)
+        response.headers['Server-Timing'] = \
+            f'db;dur={db_time * 1000:.1f}, app;dur={duration * 1000:.1f}'
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (current_app.name, endpoint, request.method)
+        with self.lock:
+            if labels not in self.latency:
+                self.latency[labels] = Histogram(LATENCY_BUCKETS)
+            self.latency[labels].observe(duration)
+            self.queries[labels] += queries
+            self.db_time[labels] += db_time
+        return response
+
+    def samples(self) -> List[str]:
+        """Get metrics in Prometheus text format"""
+        lines = ['# HELP dmms_request_duration_seconds Time of handling '
+                 'request',
+                 '# TYPE dmms_request_duration_seconds histogram']
+        with self.lock:
+            for labels, histogram in sorted(self.latency.items()):
+                names = 'app="{}",endpoint="{}",method="{}"'.format(*labels)
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'dmms_request_duration_seconds_bucket'
+                                 f'{{{names},le="{bound}"}} {count}')
+                lines.append(f'dmms_request_duration_seconds_bucket'
+                             f'{{{names},le="+Inf"}} {histogram.count}')
+                lines.append(f'dmms_request_duration_seconds_sum'
+                             f'{{{names}}} {histogram.sum}')
+                lines.append(f'dmms_request_duration_seconds_count'
+                             f'{{{names}}} {histogram.count}')
+            for name, values, help_text in (
+                    ('dmms_request_queries_total', self.queries,
+                     'SQL queries run by requests'),
+                    ('dmms_request_db_seconds_total', self.db_time,
+                     'Time of SQL queries run by requests')):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(values.items()):
+                    names = 'app="{}",endpoint="{}",method="{}"'.format(
+                        *labels)
+                    lines.append(f'{name}{{{names}}} {value}')
+        return lines
+
+    def export(self) -> Response:
+        """Show metrics of all requests"""
+        return Response('\n'.join(self.samples()) + '\n',
+                        mimetype='text/plain; version=0.0.4')
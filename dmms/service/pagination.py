@@ -0,0 +1,148 @@
+import base64
+import json
+from datetime import date
+from typing import Any, List, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from flask_restful import abort
+from sqlalchemy import and_, or_
+
+from dmms.service.parsers import iso_date
+
+
+class PageOrder:
+    """Order of page other than by id, id breaks its ties
+
+    Page sorted by column is paged by keyset of (column, id), its cursor
+    is opaque and is made for the sort only. Page ordered by expressions
+    (search rank) is paged by offset, which is its cursor.
+    """
+    def __init__(self, name: str, expressions: List,
+                 column: Optional[Any] = None):
+        self.name = name
+        self.expressions = expressions
+        self.column = column
+
+    @classmethod
+    def sort(cls, name: str, column: Any) -> 'PageOrder':
+        """Get order by column, '-' prefix of name means descending"""
+        expression = column.desc() if name.startswith('-') else column
+        return cls(name, [expression], column)
+
+    def after(self, value: Any, last_id: int, id_column: Any) -> Any:
+        """Get filter of rows which follow row with value and id"""
+        if self.name.startswith('-'):
+            follows = self.column < value
+        else:
+            follows = self.column > value
+        return or_(follows, and_(self.column == value, id_column > last_id))
+
+
+def page_size(limit: Any) -> int:
+    """Get page size limited by server maximum"""
+    max_size = current_app.config['MAX_PAGE_SIZE']
+    if not limit:
+        return min(current_app.config['DEFAULT_PAGE_SIZE'], max_size)
+    return min(limit, max_size)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack values of last row of page to opaque cursor"""
+    data = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order: PageOrder) -> List:
+    """Unpack cursor of sorted page, invokes abort if it isn't one"""
+    try:
+        name, value, last_id = json.loads(base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)))
+        # check if cursor was made for the same sort
+        if name != order.name or not isinstance(last_id, int):
+            raise ValueError
+        if order.column.type.python_type is date:
+            value = iso_date(value)
+    except (TypeError, ValueError):
+        abort(400, message={'after': f"{cursor} isn't a cursor of "
+                                     f"{order.name} sort"})
+    return [value, last_id]
+
+
+def page_cursor(args: dict, order: Optional[PageOrder] = None
+                ) -> Union[int, List, None]:
+    """Get id, offset or sort values of cursor matching order of page"""
+    after = args.get('after')
+    if after is None:
+        return None
+    if order is not None and order.column is not None:
+        return decode_cursor(str(after), order)
+    # check if cursor is id or offset, not cursor of sort
+    if not isinstance(after, int):
+        abort(400, message={'after': f'{after} is not a valid integer'})
+    return after
+
+
+def next_page_headers(cursor: Any, limit: int) -> dict:
+    """Build headers which point to the next page of current request"""
+    args = request.args.to_dict(flat=False)
+    args['after'] = [cursor]
+    args['limit'] = [limit]
+    link = f'{request.base_url}?{urlencode(args, doseq=True)}'
+    return {'Link': f'<{link}>; rel="next"', 'X-Next-Cursor': str(cursor)}
+
+
+def page_query(query: Any, id_column: Any, args: dict,
+               order: Optional[PageOrder] = None) -> Tuple[Any, int]:
+    """Limit query to one page after cursor, return it with page size
+
+    Query is paged by keyset of id, by keyset of sort column and id or
+    by offset of search rank. Invokes abort if cursor doesn't match
+    order.
+    """
+    limit = page_size(args.get('limit'))
+    cursor = page_cursor(args, order)
+    if order is None:
+        if cursor:
+            query = query.filter(id_column > cursor)
+        # one extra row tells if there is something after this page
+        return query.order_by(id_column).limit(limit + 1), limit
+    query = query.order_by(*order.expressions, id_column)
+    if order.column is None:
+        return query.offset(cursor or 0).limit(limit + 1), limit
+    if cursor:
+        query = query.filter(order.after(*cursor, id_column))
+    return query.limit(limit + 1), limit
+
+
+def row_value(row: Any, key: str) -> Any:
+    """Get value of ORM object or dict row by key"""
+    return row[key] if isinstance(row, dict) else getattr(row, key)
+
+
+def split_page(rows: List, limit: int, args: Optional[dict] = None,
+               order: Optional[PageOrder] = None) -> Tuple[List, dict]:
+    """Drop extra row of page, build headers with cursor if it exists"""
+    if len(rows) <= limit:
+        return rows, {}
+    rows = rows[:limit]
+    last_id = row_value(rows[-1], 'id')
+    if order is None:
+        return rows, next_page_headers(last_id, limit)
+    if order.column is None:
+        offset = page_cursor(args, order) or 0
+        return rows, next_page_headers(offset + limit, limit)
+    value = row_value(rows[-1], order.column.key)
+    return rows, next_page_headers(encode_cursor(order.name, value, last_id),
+                                   limit)
+
+
+def paginate(query: Any, id_column: Any, args: dict,
+             order: Optional[PageOrder] = None) -> Tuple[List, dict]:
+    """Get one page of query results using keyset pagination by id
+
+    Returns rows of the page and headers with cursor for the next page.
+    Query with order other than by id is paged as page_query pages it.
+    """
+    query, limit = page_query(query, id_column, args, order)
+    return split_page(query.all(), limit, args, order)
@@ -1,32 +1,95 @@
-from flask_restful import reqparse
-
-department_get_parser = reqparse.RequestParser(bundle_errors=True)
-department_get_parser.add_argument('id', type=int, location='args',
-                                   action='append')
-department_get_parser.add_argument('name', type=str, location='args')
-
-department_post_parser = reqparse.RequestParser(bundle_errors=True)
-department_post_parser.add_argument('name', type=str, location='json')
-
-department_put_parser = reqparse.RequestParser(bundle_errors=True)
-department_put_parser.add_argument('name', type=str, location='json')
-
-employee_get_parser = reqparse.RequestParser(bundle_errors=True)
-employee_get_parser.add_argument('id', type=int, location='args',
-                                 action='append')
-employee_get_parser.add_argument('date_of_birth_start', type=str,
-                                 location='args')
-employee_get_parser.add_argument('date_of_birth_end', type=str,
-                                 location='args')
-
-employee_post_parser = reqparse.RequestParser(bundle_errors=True)
-employee_post_parser.add_argument('name', type=str, location='json')
-employee_post_parser.add_argument('date_of_birth', type=str, location='json')
-employee_post_parser.add_argument('salary', type=float, location='json')
-employee_post_parser.add_argument('department_id', type=int, location='json')
-
-employee_put_parser = reqparse.RequestParser(bundle_errors=True)
-employee_put_parser.add_argument('name', type=str, location='json')
-employee_put_parser.add_argument('date_of_birth', type=str, location='json')
-employee_put_parser.add_argument('salary', type=float, location='json')
-employee_put_parser.add_argument('department_id', type=int, location='json')
+from datetime import date, datetime
+from typing import Optional, Union
+
+from dmms.service.schema import Field, Schema
+
+
+def iso_date(value: str) -> Optional[date]:
+    """Convert ISO formatted string (YYYY-MM-DD) to date"""
+    # empty value is treated as not provided
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"'{value}' is not a valid date. "
+                         f"Please use YYYY-MM-DD format")
+
+
+def cursor_value(value: str) -> Union[int, str]:
+    """Convert cursor of page: id or offset, or opaque cursor of sort"""
+    return int(value) if value.isdigit() else value
+
+
+department_get_schema = Schema('args', {
+    'id': Field(int, many=True),
+    'name': Field(str),
+    'q': Field(str),
+    'limit': Field(int),
+    'after': Field(cursor_value),
+    'include': Field(str, choices=('employees', 'none'),
+                     default='employees'),
+}, positive=['limit'])
+
+department_summary_schema = Schema('args', {
+    'limit': Field(int),
+    'after': Field(int),
+}, positive=['limit'])
+
+department_post_schema = Schema('json', {
+    'name': Field(str),
+}, all_filled=True)
+
+department_put_schema = Schema('json', {
+    'name': Field(str),
+}, any_filled=True)
+
+employee_get_fields = {
+    'id': Field(int, many=True),
+    'date_of_birth_start': Field(iso_date),
+    'date_of_birth_end': Field(iso_date),
+    'q': Field(str),
+    'department_id': Field(int),
+    'salary_min': Field(float),
+    'salary_max': Field(float),
+}
+
+employee_get_schema = Schema('args', dict(
+    employee_get_fields,
+    limit=Field(int),
+    after=Field(cursor_value),
+    include=Field(str, choices=('department_name', 'none'), default='none'),
+    sort=Field(str, choices=('id', '-id', 'name', '-name', 'date_of_birth',
+                             '-date_of_birth', 'salary', '-salary')),
+), positive=['limit'])
+
+employee_export_schema = Schema('args', dict(
+    employee_get_fields,
+    format=Field(str, choices=('ndjson', 'csv'), default='ndjson'),
+))
+
+employee_fields = {
+    'name': Field(str),
+    'date_of_birth': Field(iso_date),
+    'salary': Field(float),
+    'department_id': Field(int),
+}
+
+employee_post_schema = Schema('json', employee_fields, all_filled=True,
+                              positive=['salary'])
+
+employee_put_schema = Schema('json', employee_fields, any_filled=True,
+                             positive=['salary'])
+
+salary_stats_schema = Schema('args', {
+    'buckets': Field(int),
+}, positive=['buckets'])
+
+bulk_update_schema = Schema('json', {
+    'ids': Field(int, many=True),
+    'set': Field(dict),
+}, all_filled=True)
+
+bulk_delete_schema = Schema('json', {
+    'ids': Field(int, many=True),
+}, all_filled=True)
@@ -0,0 +1,60 @@
+from datetime import date
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import contains_eager
+
+from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.db import db
+
+
+def explain(query: Any) -> List[dict]:
+    """Get query plan of ORM query from database"""
+    dialect = db.engine.dialect
+    compiled = query.statement.compile(dialect=dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    if dialect.name == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN'
+    else:
+        prefix = 'EXPLAIN'
+    rows = db.session.connection().execute(f'{prefix} {compiled.string}',
+                                           params)
+    return [dict(row) for row in rows]
+
+
+def uses_index(plan: List[dict], index_name: str) -> bool:
+    """Check if query plan can use index"""
+    # SQLite shows used index in plan details,
+    # MySQL in key and possible_keys columns
+    return any(index_name in str(value)
+               for row in plan for value in row.values())
+
+
+def hot_read_queries() -> Dict[str, Any]:
+    """Get queries of the most frequent read requests"""
+    return {
+        'departments page': DepartmentsModel.query.filter(
+            DepartmentsModel.id > 0).order_by(DepartmentsModel.id).limit(100),
+        'department by name': DepartmentsModel.query.filter(
+            DepartmentsModel.name == 'name'),
+        'employees of departments': EmployeesModel.query.filter(
+            EmployeesModel.department_id.in_([1, 2])),
+        'employees page': EmployeesModel.query.filter(
+            EmployeesModel.id > 0).order_by(EmployeesModel.id).limit(100),
+        'employees by birthday range': EmployeesModel.query.filter(
+            EmployeesModel.date_of_birth >= date(1990, 1, 1),
+            EmployeesModel.date_of_birth <= date(2000, 1, 1)),
+        'employees with department name': EmployeesModel.query.outerjoin(
+            EmployeesModel.department).options(
+            contains_eager(EmployeesModel.department)).order_by(
+            EmployeesModel.id).limit(100),
+        'employees of department by birthday': EmployeesModel.query.filter(
+            EmployeesModel.department_id == 1,
+            EmployeesModel.date_of_birth >= date(1990, 1, 1),
+            EmployeesModel.date_of_birth <= date(2000, 1, 1)),
+        'salaries of department': EmployeesModel.query.with_entities(
+            EmployeesModel.salary).filter(
+            EmployeesModel.department_id == 1).order_by(
+            EmployeesModel.salary)
+    }
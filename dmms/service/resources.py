@@ -1,67 +1,254 @@
-from flask_restful import Resource, marshal_with
-from sqlalchemy.exc import IntegrityError
+from typing import Any, Callable, List, Optional
+
+from flask import Response, current_app, request, stream_with_context
+from flask_restful import Resource
+from flask_restful.utils import unpack
+from sqlalchemy import case, func, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+from werkzeug.exceptions import HTTPException
 
 from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.cache import response_cache
 from dmms.service.db import db
-from dmms.service.fields_structure import (departments_structure,
-                                           employees_structure)
-from dmms.service.parsers import (department_get_parser,
-                                  department_post_parser,
-                                  department_put_parser, employee_get_parser,
-                                  employee_post_parser, employee_put_parser)
-from dmms.service.fields_check_utils import (all_parameters_is_filled,
-                                             item_exists, value_is_positive,
-                                             any_parameter_is_filled,
-                                             value_provided, not_wrong_url)
+from dmms.service.export import (EMPLOYEES_EXPORT_COLUMNS, csv_lines,
+                                 ndjson_lines)
+from dmms.service.fields_structure import (departments_serializer,
+                                           departments_short_serializer,
+                                           departments_summary_serializer,
+                                           employees_department_serializer,
+                                           employees_serializer)
+from dmms.service.pagination import (PageOrder, next_page_headers,
+                                     page_size, paginate)
+from dmms.service.parsers import (bulk_delete_schema, bulk_update_schema,
+                                  department_get_schema,
+                                  department_post_schema,
+                                  department_put_schema,
+                                  department_summary_schema,
+                                  employee_export_schema, employee_get_schema,
+                                  employee_post_schema, employee_put_schema,
+                                  salary_stats_schema)
+from dmms.service.salary_stats import (histogram_buckets, salary_columns,
+                                       salary_stats)
+from dmms.service.schema import Schema
+from dmms.service.search import search_filter, search_rank
+from dmms.service.versions import bump_version, get_versions, make_etag
+from dmms.service.fields_check_utils import (item_exists, value_provided,
+                                             not_wrong_url,
+                                             batch_size_is_allowed,
+                                             item_is_object)
+
+
+def bulk_create(model: Any, items: List, schema: Schema,
+                conflict_message: str):
+    """Validate all items and create them in one transaction
+
+    Items are checked by the same schema as single item.
+    If any item is wrong nothing is created and errors of each wrong
+    item are returned.
+    """
+    batch_size_is_allowed(items)
+    rows = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            item_is_object(item)
+            args = schema.parse_item(item)
+        except HTTPException as error:
+            message = getattr(error, 'data', {}).get('message',
+                                                     error.description)
+            errors.append({'index': index, 'message': message})
+        else:
+            rows.append(args)
+    if errors:
+        return errors, 400
+    chunk_size = current_app.config['BULK_INSERT_CHUNK_SIZE']
+    ids = []
+    try:
+        # each chunk is inserted by one multi-row INSERT statement
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            ids.extend(inserted_ids(db.session.execute(
+                model.__table__.insert().values(chunk)), len(chunk)))
+        bump_version(model.__tablename__)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return conflict_message, 409
+    return [{'index': index, 'id': item_id}
+            for index, item_id in enumerate(ids)], 201
+
+
+def inserted_ids(result: Any, count: int) -> List[int]:
+    """Get ids of rows inserted by one multi-row INSERT statement"""
+    # rows of one INSERT get consecutive ids, MySQL reports id of first
+    # row and SQLite reports id of last row
+    if db.engine.dialect.name == 'mysql':
+        first_id = result.lastrowid
+    else:
+        first_id = result.lastrowid - count + 1
+    return list(range(first_id, first_id + count))
+
+
+def bulk_change(model: Any, ids: List[int],
+                change: Callable[[Any], None]) -> List[int]:
+    """Apply change to items by chunks of ids and get missing ids
+
+    Each chunk is changed by one statement with WHERE id IN (...).
+    """
+    ids = list(dict.fromkeys(ids))
+    chunk_size = current_app.config['BULK_CHUNK_SIZE']
+    found = set()
+    for start in range(0, len(ids), chunk_size):
+        chunk_query = model.query.filter(
+            model.id.in_(ids[start:start + chunk_size]))
+        found.update(row.id for row in chunk_query.with_entities(model.id))
+        change(chunk_query)
+    return [item_id for item_id in ids if item_id not in found]
+
+
+def conditional_read(name: str, args: dict, tables: List[str],
+                     read: Callable[[], Any]):
+    """Get response of read request using ETag and response cache
+
+    ETag depends on versions of tables the response is read from, so
+    for matching If-None-Match 304 is returned without reading rows.
+    """
+    versions = get_versions(tables)
+    etag = make_etag(name, args, versions)
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+
+    def read_without_link():
+        data, code, headers = unpack(read())
+        # link to next page depends on URL of request, so it isn't
+        # cached and is built for every response from cursor
+        headers = {key: value for key, value in dict(headers).items()
+                   if key != 'Link'}
+        return data, code, headers
+    data, code, headers = unpack(
+        response_cache.get_or_set(name, args, versions, read_without_link))
+    if 'X-Next-Cursor' in headers:
+        headers = dict(headers, **next_page_headers(
+            headers['X-Next-Cursor'], page_size(args.get('limit'))))
+    return data, code, dict(headers, ETag=f'"{etag}"')
+
+
+def employees_loader():
+    """Get loader option of departments employees set in config"""
+    if current_app.config['DEPARTMENTS_EMPLOYEES_LOADING'] == 'joined':
+        return joinedload(DepartmentsModel.employees)
+    return selectinload(DepartmentsModel.employees)
 
 
 class Departments(Resource):
     """API for Departments CRUD operations"""
-    @marshal_with(departments_structure)
     def get(self, department_id=None):
         """Get all departments or some departments by id or name"""
         # check if user didn't use /departments/<department_id> link
         # if used - invokes abort
         not_wrong_url(department_id)
-        args = department_get_parser.parse_args(strict=True)
-        if args.get('id'):
-            return DepartmentsModel.query.filter(
-                DepartmentsModel.id.in_(args['id'])).all()
+        args = department_get_schema.parse_args()
+        if args['include'] == 'none':
+            tables = ['departments']
+        else:
+            tables = ['departments', 'employees']
+        return conditional_read('departments', args, tables,
+                                lambda: self.read(args))
+
+    @staticmethod
+    def read(args: dict):
+        """Read departments from database"""
+        # employees are loaded eagerly so serializing doesn't run
+        # one query per department, or aren't loaded at all
+        if args['include'] == 'none':
+            serializer = departments_short_serializer
+            query = DepartmentsModel.query
+        else:
+            serializer = departments_serializer
+            query = DepartmentsModel.query.options(employees_loader())
         if args.get('name'):
-            return DepartmentsModel.query.filter(
-                DepartmentsModel.name == args['name']).first()
-        return DepartmentsModel.query.all(), 200
+            return serializer(query.filter(
+                DepartmentsModel.name == args['name']).first())
+        if args.get('id'):
+            query = query.filter(DepartmentsModel.id.in_(args['id']))
+        # found departments are ordered by how well names match query
+        rank = None
+        if args.get('q'):
+            query = query.filter(search_filter(DepartmentsModel, args['q']))
+            rank = PageOrder('rank', search_rank(DepartmentsModel, args['q']))
+        departments, headers = paginate(query, DepartmentsModel.id, args,
+                                        rank)
+        return serializer(departments), 200, headers
 
     def post(self, department_id=None):
         """Create new department"""
         # check if user didn't use /departments/<department_id> link
         # if used - invokes abort
         not_wrong_url(department_id)
-        args = department_post_parser.parse_args(strict=True)
+        # JSON array creates many departments at once
+        items = request.get_json(silent=True)
+        if isinstance(items, list):
+            return bulk_create(DepartmentsModel, items,
+                               department_post_schema,
+                               "Departments weren't added. Some of them "
+                               "already exist")
         # check if user has passed all parameters
         # if hasn't - invokes abort
-        all_parameters_is_filled(args)
+        args = department_post_schema.parse_args()
         department = DepartmentsModel(**args)
         db.session.add(department)
-        db.session.commit()
+        try:
+            bump_version('departments')
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return f"Department {args['name']} already exists", 409
         return f'New department {department.name} with id {department.id} ' \
                f'was added', 201
 
     def put(self, department_id=None):
         """Edit department"""
         value_provided(department_id, 'updating')
-        args = department_put_parser.parse_args(strict=True)
-        any_parameter_is_filled(args)
+        args = department_put_schema.parse_args()
         department = DepartmentsModel.query.filter_by(id=department_id)
         item_exists(department.first(), 'Department', department_id)
         update_data = {k: v for k, v in args.items() if v}
-        department.update(update_data)
+        try:
+            department.update(update_data)
+        except IntegrityError:
+            db.session.rollback()
+            return f"Department {args['name']} already exists", 409
+        bump_version('departments')
         db.session.commit()
         return f'Department {department_id} was updated ' \
                f'with data {update_data}', 200
 
+    def patch(self, department_id=None):
+        """Edit many departments by id list"""
+        not_wrong_url(department_id)
+        args = bulk_update_schema.parse_args()
+        update_data = department_put_schema.parse_item(args['set'])
+        update_data = {k: v for k, v in update_data.items() if v}
+        try:
+            missing = bulk_change(DepartmentsModel, args['ids'],
+                                  lambda query: query.update(
+                                      update_data,
+                                      synchronize_session=False))
+        except IntegrityError:
+            db.session.rollback()
+            return "Departments weren't updated. Names of departments " \
+                   "have to be unique", 409
+        bump_version('departments')
+        db.session.commit()
+        return {'message': f'Departments were updated with data '
+                           f'{update_data}',
+                'missing': missing}, 200
+
     def delete(self, department_id=None):
-        """Delete department"""
+        """Delete department or many departments by id list"""
+        if department_id is None and request.is_json:
+            return self.delete_many()
         value_provided(department_id, 'deleting')
         department = DepartmentsModel.query.filter_by(id=department_id)
         item_exists(department.first(), 'Department', department_id)
@@ -70,53 +257,171 @@ class Departments(Resource):
         except IntegrityError:
             return "Department wasn't deleted. Please delete employees " \
                    "from this department first", 500
+        bump_version('departments')
         db.session.commit()
         return f'Department {department_id} was successfully deleted', 200
 
+    @staticmethod
+    def delete_many():
+        """Delete many departments by id list"""
+        args = bulk_delete_schema.parse_args()
+        try:
+            missing = bulk_change(DepartmentsModel, args['ids'],
+                                  lambda query: query.delete(
+                                      synchronize_session=False))
+        except IntegrityError:
+            db.session.rollback()
+            return "Departments weren't deleted. Please delete employees " \
+                   "from these departments first", 500
+        bump_version('departments')
+        db.session.commit()
+        return {'message': 'Departments were successfully deleted',
+                'missing': missing}, 200
+
+
+def department_salary(aggregate: Any):
+    """Get aggregate of salaries of department read from its index"""
+    return select([aggregate(EmployeesModel.salary)]).where(
+        EmployeesModel.department_id == DepartmentsModel.id).as_scalar()
+
+
+def departments_summary_query():
+    """Get query of headcount and salary aggregates of departments"""
+    # headcount and salary sum are counters of departments and min and
+    # max are read from (department_id, salary) index, so employees
+    # rows are never scanned
+    return db.session.query(
+        DepartmentsModel.id,
+        DepartmentsModel.name,
+        DepartmentsModel.headcount,
+        case([(DepartmentsModel.headcount > 0,
+               DepartmentsModel.salary_sum)]).label('salary_sum'),
+        (DepartmentsModel.salary_sum / func.nullif(
+            DepartmentsModel.headcount, 0)).label('salary_avg'),
+        department_salary(func.min).label('salary_min'),
+        department_salary(func.max).label('salary_max'))
+
+
+class DepartmentsSummary(Resource):
+    """API for departments aggregated salary info"""
+    def get(self):
+        """Get headcount and salary aggregates of all departments"""
+        args = department_summary_schema.parse_args()
+        return conditional_read('departments_summary', args,
+                                ['departments', 'employees'],
+                                lambda: self.read(args))
+
+    @staticmethod
+    def read(args: dict):
+        """Read departments aggregates from database"""
+        summary, headers = paginate(departments_summary_query(),
+                                    DepartmentsModel.id, args)
+        return departments_summary_serializer(summary), 200, headers
+
+
+def employees_query(args: dict):
+    """Get employees query filtered by args of employees request"""
+    # construct id filter
+    if args['id']:
+        id_filter = EmployeesModel.id.in_(args['id'])
+    else:
+        id_filter = True
+    # construct date_of_birth_start filter
+    if args['date_of_birth_start']:
+        bd_start = args['date_of_birth_start']
+        bd_start_filter = EmployeesModel.date_of_birth >= bd_start
+    else:
+        bd_start_filter = True
+    # construct date_of_birth_end filter
+    if args['date_of_birth_end']:
+        bd_end = args['date_of_birth_end']
+        bd_end_filter = EmployeesModel.date_of_birth <= bd_end
+    else:
+        bd_end_filter = True
+    # construct name search filter
+    if args.get('q'):
+        name_filter = search_filter(EmployeesModel, args['q'])
+    else:
+        name_filter = True
+    # construct department filter
+    if args.get('department_id'):
+        department_filter = \
+            EmployeesModel.department_id == args['department_id']
+    else:
+        department_filter = True
+    # construct salary_min filter
+    if args.get('salary_min') is not None:
+        salary_min_filter = EmployeesModel.salary >= args['salary_min']
+    else:
+        salary_min_filter = True
+    # construct salary_max filter
+    if args.get('salary_max') is not None:
+        salary_max_filter = EmployeesModel.salary <= args['salary_max']
+    else:
+        salary_max_filter = True
+    return EmployeesModel.query.filter(
+        id_filter, bd_start_filter, bd_end_filter, name_filter,
+        department_filter, salary_min_filter, salary_max_filter)
+
+
+def employees_order(args: dict) -> Optional[PageOrder]:
+    """Get order of employees page, None if it is ordered by id"""
+    sort = args.get('sort')
+    # found employees are ordered by rank unless sort is requested
+    if not sort or sort == 'id':
+        if args.get('q'):
+            return PageOrder('rank', search_rank(EmployeesModel, args['q']))
+        return None
+    return PageOrder.sort(sort, getattr(EmployeesModel, sort.lstrip('-')))
+
 
 class Employees(Resource):
     """API for Employees CRUD operations"""
-    @marshal_with(employees_structure)
     def get(self, employee_id=None):
-        """Get all employees or some employees by id or birthday range"""
+        """Get employees filtered and sorted by args of request"""
         # check if user didn't use /employee/<employee_id> link
         # if used - invokes abort
         not_wrong_url(employee_id)
-        args = employee_get_parser.parse_args(strict=True)
-        # construct id filter
-        if args['id']:
-            id_filter = EmployeesModel.id.in_(args['id'])
-        else:
-            id_filter = True
-        # construct date_of_birth_start filter
-        if args['date_of_birth_start']:
-            bd_start = args['date_of_birth_start']
-            bd_start_filter = EmployeesModel.date_of_birth >= bd_start
+        args = employee_get_schema.parse_args()
+        if args['include'] == 'department_name':
+            tables = ['employees', 'departments']
         else:
-            bd_start_filter = True
-        # construct date_of_birth_end filter
-        if args['date_of_birth_end']:
-            bd_end = args['date_of_birth_end']
-            bd_end_filter = EmployeesModel.date_of_birth <= bd_end
+            tables = ['employees']
+        return conditional_read('employees', args, tables,
+                                lambda: self.read(args))
+
+    @staticmethod
+    def read(args: dict):
+        """Read employees from database"""
+        query = employees_query(args)
+        # department name is taken from the same query by join
+        if args['include'] == 'department_name':
+            serializer = employees_department_serializer
+            query = query.outerjoin(EmployeesModel.department).options(
+                contains_eager(EmployeesModel.department))
         else:
-            bd_end_filter = True
-        return EmployeesModel.query.filter(
-            id_filter, bd_start_filter, bd_end_filter).all(), 200
+            serializer = employees_serializer
+        employees, headers = paginate(query, EmployeesModel.id, args,
+                                      employees_order(args))
+        return serializer(employees), 200, headers
 
     def post(self, employee_id=None):
         """Create new employee"""
         # check if user didn't use /employees/<employee_id> link
         # if used - invokes abort
         not_wrong_url(employee_id)
-        args = employee_post_parser.parse_args(strict=True)
-        # check if user has passed all parameters
-        # if hasn't - invokes abort
-        all_parameters_is_filled(args)
-        # check if salary is positive number
-        # if not - invokes abort
-        value_is_positive(['salary'], args)
+        # JSON array creates many employees at once
+        items = request.get_json(silent=True)
+        if isinstance(items, list):
+            return bulk_create(EmployeesModel, items, employee_post_schema,
+                               "Employees weren't added. Please check that "
+                               "their departments exist")
+        # check if user has passed all parameters and salary is
+        # positive number, if not - invokes abort
+        args = employee_post_schema.parse_args()
         employee = EmployeesModel(**args)
         db.session.add(employee)
+        bump_version('employees')
         db.session.commit()
         return f'New employee {employee.name} with id {employee.id} ' \
                f'was added', 201
@@ -125,23 +430,126 @@ class Employees(Resource):
         """Edit employee"""
         # check if user provided employee_id
         value_provided(employee_id, 'updating')
-        args = employee_put_parser.parse_args(strict=True)
-        any_parameter_is_filled(args)
-        value_is_positive(['salary'], args)
+        args = employee_put_schema.parse_args()
         employee = EmployeesModel.query.filter_by(id=employee_id)
         item_exists(employee.first(), 'Employee', employee_id)
         update_data = {k: v for k, v in args.items() if v}
         employee.update(update_data)
+        bump_version('employees')
         db.session.commit()
         return f'Employee {employee_id} was updated with ' \
                f'data {update_data}', 200
 
+    def patch(self, employee_id=None):
+        """Edit many employees by id list"""
+        not_wrong_url(employee_id)
+        args = bulk_update_schema.parse_args()
+        update_data = employee_put_schema.parse_item(args['set'])
+        update_data = {k: v for k, v in update_data.items() if v}
+        try:
+            missing = bulk_change(EmployeesModel, args['ids'],
+                                  lambda query: query.update(
+                                      update_data,
+                                      synchronize_session=False))
+        except IntegrityError:
+            db.session.rollback()
+            return "Employees weren't updated. Please check that " \
+                   "department exists", 409
+        bump_version('employees')
+        db.session.commit()
+        return {'message': f'Employees were updated with data '
+                           f'{update_data}',
+                'missing': missing}, 200
+
     def delete(self, employee_id=None):
-        """Delete employee"""
+        """Delete employee or many employees by id list"""
+        if employee_id is None and request.is_json:
+            return self.delete_many()
         # check if user provided employee_id
         value_provided(employee_id, 'deleting')
         employee = EmployeesModel.query.filter_by(id=employee_id)
         item_exists(employee.first(), 'Employee', employee_id)
         employee.delete()
+        bump_version('employees')
         db.session.commit()
         return f'Employee {employee_id} was successfully deleted', 200
+
+    @staticmethod
+    def delete_many():
+        """Delete many employees by id list"""
+        args = bulk_delete_schema.parse_args()
+        missing = bulk_change(EmployeesModel, args['ids'],
+                              lambda query: query.delete(
+                                  synchronize_session=False))
+        bump_version('employees')
+        db.session.commit()
+        return {'message': 'Employees were successfully deleted',
+                'missing': missing}, 200
+
+
+class EmployeesExport(Resource):
+    """API for export of employees as NDJSON or CSV"""
+    def get(self):
+        """Stream employees filtered by args of request"""
+        args = employee_export_schema.parse_args()
+        chunk_size = current_app.config['EXPORT_CHUNK_SIZE']
+        columns = [getattr(EmployeesModel, column)
+                   for column in EMPLOYEES_EXPORT_COLUMNS]
+        # rows are fetched from server-side cursor by chunks and sent
+        # right away, so memory doesn't depend on number of employees
+        rows = employees_query(args).with_entities(*columns).order_by(
+            EmployeesModel.id).execution_options(
+            stream_results=True).yield_per(chunk_size)
+        if args['format'] == 'csv':
+            return Response(
+                stream_with_context(csv_lines(rows, chunk_size)),
+                mimetype='text/csv',
+                headers={'Content-Disposition':
+                         'attachment; filename=employees.csv'})
+        return Response(stream_with_context(ndjson_lines(rows)),
+                        mimetype='application/x-ndjson')
+
+
+class SalaryStats(Resource):
+    """API for salary statistics of company or of department"""
+    def get(self, department_id=None):
+        """Get salary statistics of all employees or of department"""
+        args = salary_stats_schema.parse_args()
+        args['buckets'] = histogram_buckets(args['buckets'])
+        if department_id is None:
+            return conditional_read('salary_stats', args, ['employees'],
+                                    lambda: self.read(args))
+        # check if department exists
+        # if doesn't - invokes abort
+        item_exists(DepartmentsModel.query.get(department_id),
+                    'Department', department_id)
+        args['department_id'] = department_id
+        return conditional_read('salary_stats', args,
+                                ['departments', 'employees'],
+                                lambda: self.read(args))
+
+    @staticmethod
+    def read(args: dict):
+        """Read salary statistics from sorted salaries"""
+        salaries = salary_columns.get(args.get('department_id'))
+        return salary_stats(salaries, args['buckets']), 200
+
+
+class CacheStats(Resource):
+    """API for response cache counters"""
+    def get(self):
+        """Get response cache hit and miss counters"""
+        return response_cache.stats(), 200
+
+
+class Health(Resource):
+    """API for readiness check of service"""
+    def get(self):
+        """Check if database answers queries"""
+        try:
+            db.session.execute('SELECT 1')
+        except SQLAlchemyError as error:
+            db.session.rollback()
+            return {'status': 'unavailable',
+                    'database': str(getattr(error, 'orig', error))}, 503
+        return {'status': 'ok', 'database': 'ok'}, 200
@@ -0,0 +1,135 @@
+import time
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from werkzeug.local import LocalProxy
+
+from dmms.models.model import EmployeesModel
+from dmms.service.db import db
+from dmms.service.versions import get_versions
+
+PERCENTILES = {'p10': 0.1, 'p50': 0.5, 'p90': 0.9}
+
+
+def histogram_buckets(buckets: Optional[int]) -> int:
+    """Get number of histogram buckets limited by server maximum"""
+    max_buckets = current_app.config['MAX_SALARY_HISTOGRAM_BUCKETS']
+    if not buckets:
+        return min(current_app.config['SALARY_HISTOGRAM_BUCKETS'],
+                   max_buckets)
+    return min(buckets, max_buckets)
+
+
+def histogram_edges(low: float, high: float, buckets: int) -> List[float]:
+    """Get edges of buckets of equal width from low to high"""
+    width = (high - low) / buckets
+    return [low + width * index for index in range(buckets)] + [high]
+
+
+def fetch_salaries(department_id: Optional[int] = None) -> np.ndarray:
+    """Read sorted salaries of department or of all employees"""
+    salary = EmployeesModel.salary
+    statement = select([salary]).order_by(salary)
+    if department_id is not None:
+        statement = statement.where(
+            EmployeesModel.department_id == department_id)
+    # salaries are read in order of salary or (department_id, salary)
+    # index, rows are taken from DBAPI cursor without row objects
+    result = db.session.execute(statement)
+    try:
+        return np.fromiter((row[0] for row in result.cursor), dtype=float)
+    finally:
+        result.close()
+
+
+def percentiles(salaries: np.ndarray,
+                fractions: Dict[str, float]) -> Dict[str, float]:
+    """Get percentiles of sorted salaries with linear interpolation"""
+    result = {}
+    for name, fraction in fractions.items():
+        position = fraction * (len(salaries) - 1)
+        low = salaries[int(position)]
+        high = salaries[min(int(position) + 1, len(salaries) - 1)]
+        result[name] = float(low + (high - low) * (position - int(position)))
+    return result
+
+
+def histogram(salaries: np.ndarray, buckets: int) -> List[dict]:
+    """Count sorted salaries in buckets of equal width from min to max"""
+    low, high = float(salaries[0]), float(salaries[-1])
+    if low == high:
+        return [{'from': low, 'to': high, 'count': len(salaries)}]
+    edges = histogram_edges(low, high, buckets)
+    # each bucket includes its lower edge and max is counted in last
+    # bucket, bounds of buckets are found by binary search
+    bounds = np.searchsorted(salaries, edges[1:-1], side='left')
+    counts = np.diff(np.concatenate(([0], bounds, [len(salaries)])))
+    return [{'from': edges[index], 'to': edges[index + 1],
+             'count': int(counts[index])} for index in range(buckets)]
+
+
+def salary_stats(salaries: np.ndarray, buckets: int) -> dict:
+    """Get count, mean, stddev, percentiles and histogram of salaries
+
+    Salaries have to be sorted. Stddev is computed by two passes over
+    salaries, so it keeps its precision for large salaries.
+    """
+    if not len(salaries):
+        return dict({'count': 0, 'mean': None, 'stddev': None, 'min': None,
+                     'max': None, 'histogram': []},
+                    **{name: None for name in PERCENTILES})
+    stats = {'count': len(salaries), 'mean': float(salaries.mean()),
+             'stddev': float(salaries.std()),
+             'min': float(salaries[0]), 'max': float(salaries[-1]),
+             'histogram': histogram(salaries, buckets)}
+    stats.update(percentiles(salaries, PERCENTILES))
+    return stats
+
+
+class SalaryColumns:
+    """Sorted salaries of company and of departments kept in memory
+
+    Salaries are read from database once for each version of employees
+    table and are kept until the version changes or ttl passes. Zero
+    ttl turns keeping off. Each app has its own columns in
+    app.extensions.
+    """
+    def __init__(self):
+        self.ttl = 0
+        self.version = None
+        self.expires = 0.0
+        self.columns: Dict[Optional[int], np.ndarray] = {}
+        self.lock = Lock()
+
+    def init_app(self, app) -> None:
+        """Set ttl of columns from app config"""
+        app.extensions['salary_columns'] = self
+        self.ttl = app.config['SALARY_COLUMNS_TTL']
+
+    def get(self, department_id: Optional[int] = None) -> np.ndarray:
+        """Get sorted salaries of department or of all employees"""
+        if not self.ttl:
+            return fetch_salaries(department_id)
+        table = EmployeesModel.__tablename__
+        version = get_versions([table])[table]
+        with self.lock:
+            # check if employees were changed or columns are expired
+            # if so - all columns are read again
+            if version != self.version or time.monotonic() > self.expires:
+                self.version = version
+                self.expires = time.monotonic() + self.ttl
+                self.columns = {}
+            salaries = self.columns.get(department_id)
+        if salaries is None:
+            salaries = fetch_salaries(department_id)
+            with self.lock:
+                if version == self.version:
+                    self.columns[department_id] = salaries
+        return salaries
+
+
+# salary columns of current app
+salary_columns = LocalProxy(lambda: current_app.extensions['salary_columns'])
@@ -0,0 +1,137 @@
+from collections.abc import MutableSequence
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import request
+from flask_restful import abort, reqparse
+from werkzeug.exceptions import BadRequest
+
+from dmms.service.fields_check_utils import (all_parameters_is_filled,
+                                             any_parameter_is_filled,
+                                             value_is_positive)
+
+
+class Field:
+    """Declaration of one request argument"""
+    def __init__(self, type: Callable[[Any], Any] = str, many: bool = False,
+                 choices: Optional[Tuple] = None, default: Any = None):
+        self.type = type
+        self.many = many
+        self.choices = choices
+        self.default = default
+
+
+class Schema:
+    """Request arguments compiled once into one validation function
+
+    Gives the same arguments and the same 400, 406 error messages as
+    reqparse parser with bundle_errors=True and strict=True followed by
+    checks of fields_check_utils:
+    all_filled - all_parameters_is_filled,
+    any_filled - any_parameter_is_filled,
+    positive - value_is_positive for these keys.
+    """
+    def __init__(self, location: str, fields: Dict[str, Field],
+                 all_filled: bool = False, any_filled: bool = False,
+                 positive: Iterable[str] = ()):
+        self.location = location
+        self.fields = fields
+        self.all_filled = all_filled
+        self.any_filled = any_filled
+        self.positive = tuple(positive)
+        self.validate = self.compile()
+
+    def compile(self) -> Callable[[Any, Iterable[str]], dict]:
+        """Build validation function of source and other request keys"""
+        fields = [(name, field.type, field.many, field.choices,
+                   field.default) for name, field in self.fields.items()]
+        names = frozenset(self.fields)
+        all_filled = self.all_filled
+        any_filled = self.any_filled
+        positive = self.positive
+
+        def validate(source: Any, other_keys: Iterable[str]) -> dict:
+            multi = hasattr(source, 'getlist')
+            args = {}
+            errors = {}
+            for name, convert, many, choices, default in fields:
+                if name not in source:
+                    args[name] = default
+                    continue
+                if multi:
+                    values = source.getlist(name)
+                else:
+                    values = source[name]
+                    if not (many and isinstance(values, MutableSequence)):
+                        values = [values]
+                results = []
+                for value in values:
+                    # null isn't converted
+                    if value is not None:
+                        try:
+                            value = convert(value)
+                        except Exception as error:
+                            errors[name] = str(error)
+                            break
+                    if choices and value not in choices:
+                        errors[name] = f'{value} is not a valid choice'
+                        break
+                    results.append(value)
+                else:
+                    if not results:
+                        args[name] = default
+                    else:
+                        args[name] = results if many else results[0]
+            if errors:
+                abort(400, message=errors)
+            unknown = [key for key in dict.fromkeys(other_keys)
+                       if key not in names or key not in source]
+            if unknown:
+                raise BadRequest(f'Unknown arguments: {", ".join(unknown)}')
+            if all_filled and not all(args.values()):
+                all_parameters_is_filled(args)
+            if any_filled and not any(args.values()):
+                any_parameter_is_filled(args)
+            for key in positive:
+                if args[key] and args[key] <= 0:
+                    value_is_positive([key], args)
+            return args
+        return validate
+
+    def parse_args(self, req: Any = None) -> dict:
+        """Validate arguments of request"""
+        req = req or request
+        body = req.json
+        body = body if isinstance(body, dict) else {}
+        # keys of both JSON and query are checked for unknown arguments
+        other_keys = [*body, *(key for key, _
+                               in req.values.items(multi=True))]
+        if self.location == 'args':
+            return self.validate(req.args, other_keys)
+        return self.validate(body, other_keys)
+
+    def parse_item(self, item: dict) -> dict:
+        """Validate one object of JSON array the same way as request JSON"""
+        return self.validate(item, item)
+
+    def to_reqparse(self) -> reqparse.RequestParser:
+        """Build reqparse parser with the same arguments"""
+        parser = reqparse.RequestParser(bundle_errors=True)
+        for name, field in self.fields.items():
+            parser.add_argument(name, type=field.type,
+                                location=self.location,
+                                action='append' if field.many else 'store',
+                                choices=field.choices,
+                                default=field.default)
+        return parser
+
+    def checks(self) -> List[Callable[[dict], None]]:
+        """Get fields_check_utils checks run after reqparse parser"""
+        checks = []
+        if self.all_filled:
+            checks.append(all_parameters_is_filled)
+        if self.any_filled:
+            checks.append(any_parameter_is_filled)
+        if self.positive:
+            checks.append(lambda args: value_is_positive(self.positive,
+                                                         args))
+        return checks
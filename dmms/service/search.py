@@ -0,0 +1,90 @@
+from typing import Any, List
+
+from sqlalchemy import DDL, case, event, func, literal_column, select
+from sqlalchemy.sql import column, table
+
+from dmms.service.db import db
+
+# shortest query which can be found by index of dialect, shorter
+# queries are matched by LIKE
+MIN_INDEXED_LENGTH = {'sqlite': 3, 'mysql': 2}
+
+
+def sqlite_index_ddl(name: str) -> List[str]:
+    """Get statements creating FTS5 trigram index of names of table"""
+    # index doesn't keep copy of names, they are read from table itself
+    # and index is kept in sync by triggers
+    fts = f'{name}_fts'
+    remove = f"INSERT INTO {fts}({fts}, rowid, name) " \
+             f"VALUES ('delete', old.id, old.name);"
+    add = f'INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name);'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, "
+        f"content='{name}', content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {name} '
+        f'BEGIN {add} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {name} '
+        f'BEGIN {remove} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF name '
+        f'ON {name} BEGIN {remove} {add} END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_drop_ddl(name: str) -> List[str]:
+    """Get statements dropping FTS5 index of names of table"""
+    fts = f'{name}_fts'
+    return [f'DROP TRIGGER IF EXISTS {fts}_{action}'
+            for action in ('insert', 'delete', 'update')] + \
+        [f'DROP TABLE IF EXISTS {fts}']
+
+
+def mysql_index_ddl(name: str) -> List[str]:
+    """Get statements creating FULLTEXT n-gram index of names of table"""
+    return [f'ALTER TABLE {name} ADD FULLTEXT INDEX ix_{name}_name_fulltext '
+            f'(name) WITH PARSER ngram']
+
+
+def mysql_drop_ddl(name: str) -> List[str]:
+    """Get statements dropping FULLTEXT index of names of table"""
+    return [f'ALTER TABLE {name} DROP INDEX ix_{name}_name_fulltext']
+
+
+def add_search_index(target: Any) -> None:
+    """Create and drop search index of names together with table"""
+    name = target.name
+    for statement in sqlite_index_ddl(name):
+        event.listen(target, 'after_create',
+                     DDL(statement).execute_if(dialect='sqlite'))
+    for statement in mysql_index_ddl(name):
+        event.listen(target, 'after_create',
+                     DDL(statement).execute_if(dialect='mysql'))
+    for statement in sqlite_drop_ddl(name):
+        event.listen(target, 'before_drop',
+                     DDL(statement).execute_if(dialect='sqlite'))
+
+
+def search_filter(model: Any, q: str) -> Any:
+    """Get filter of rows which names contain query"""
+    dialect = db.engine.dialect.name
+    # check if query is long enough to be found by index
+    # if not - names are scanned by LIKE
+    if len(q) < MIN_INDEXED_LENGTH.get(dialect, len(q) + 1):
+        return model.name.contains(q, autoescape=True)
+    if dialect == 'mysql':
+        # phrase of n-grams matches names containing query
+        return model.name.match('"{}"'.format(q.replace('"', ' ')))
+    fts = f'{model.__tablename__}_fts'
+    matched = select([table(fts, column('rowid')).c.rowid]).where(
+        literal_column(fts).op('MATCH')('"{}"'.format(q.replace('"', '""'))))
+    return model.id.in_(matched)
+
+
+def search_rank(model: Any, q: str) -> List[Any]:
+    """Get order of found rows: exact match, prefix, position, length"""
+    name = func.lower(model.name)
+    q = q.lower()
+    return [case([(name == q, 0),
+                  (name.startswith(q, autoescape=True), 1)], else_=2),
+            func.instr(name, q), func.length(model.name)]
+
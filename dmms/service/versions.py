@@ -0,0 +1,97 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from dmms.models.model import TableVersionsModel
+from dmms.service.db import db
+
+# tables whose versions are kept, their rows are created by create_db
+VERSIONED_TABLES = ('departments', 'employees')
+# key of session info keeping tables changed by its transaction
+CHANGED_TABLES_KEY = 'dmms.changed_tables'
+
+
+def insert_missing_versions(tables: Iterable[str],
+                            connection: Optional[Any] = None) -> None:
+    """Create version rows of tables which don't have them yet"""
+    # existing rows are kept as they are, so concurrent writers
+    # creating the same row never fail
+    statement = TableVersionsModel.__table__.insert().prefix_with(
+        'IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite')
+    (connection or db.session).execute(
+        statement, [{'name': table, 'version': 0} for table in tables])
+
+
+def increment_version(table: str, connection: Optional[Any] = None) -> int:
+    """Increment version of table, get number of changed rows"""
+    versions = TableVersionsModel.__table__
+    return (connection or db.session).execute(
+        versions.update().where(versions.c.name == table).values(
+            version=versions.c.version + 1)).rowcount
+
+
+def write_versions(tables: Iterable[str], bind: Optional[Any] = None
+                   ) -> None:
+    """Increment versions of tables in their own short transaction"""
+    # tables are always locked in the same order, so writers changing
+    # several tables don't deadlock
+    with (bind or db.engine).begin() as connection:
+        for table in sorted(tables):
+            if not increment_version(table, connection):
+                insert_missing_versions([table], connection)
+                increment_version(table, connection)
+
+
+def bump_version(table: str) -> None:
+    """Increment version of table after transaction of session commits
+
+    Version row isn't locked by transaction of write, so concurrent
+    writers of table don't wait for each other until commit.
+    """
+    db.session.info.setdefault(CHANGED_TABLES_KEY, set()).add(table)
+
+
+def write_changed_versions(session: Session) -> None:
+    """Increment versions of tables changed by committed transaction"""
+    tables = session.info.pop(CHANGED_TABLES_KEY, None)
+    if not tables:
+        return
+    # rows are committed already, so error isn't raised to writer,
+    # cached responses of tables are renewed when they expire
+    try:
+        write_versions(tables, session.get_bind())
+    except SQLAlchemyError:
+        current_app.logger.exception('Versions of %s were not incremented',
+                                     ', '.join(sorted(tables)))
+
+
+def forget_changed_tables(session: Session,
+                          previous_transaction: Any) -> None:
+    """Forget tables changed by rolled back transaction of session"""
+    # check if the whole transaction is rolled back, not savepoint
+    if previous_transaction.parent is None:
+        session.info.pop(CHANGED_TABLES_KEY, None)
+
+
+event.listen(Session, 'after_commit', write_changed_versions)
+event.listen(Session, 'after_soft_rollback', forget_changed_tables)
+
+
+def get_versions(tables: Iterable[str]) -> Dict[str, int]:
+    """Get current versions of tables"""
+    tables = sorted(tables)
+    versions = dict(db.session.query(
+        TableVersionsModel.name, TableVersionsModel.version).filter(
+        TableVersionsModel.name.in_(tables)))
+    return {table: versions.get(table, 0) for table in tables}
+
+
+def make_etag(name: str, args: dict, versions: Dict[str, int]) -> str:
+    """Build ETag from name of response, its args and tables versions"""
+    key = json.dumps([name, args, versions], sort_keys=True, default=str)
+    return hashlib.sha1(key.encode()).hexdigest()
@@ -0,0 +1,33 @@
+import unittest
+
+from dmms.benchmarks.compare import regressions
+
+
+class RegressionsTest(unittest.TestCase):
+    """Test comparison of benchmark results"""
+    def setUp(self):
+        """Create results of old commit"""
+        self.old = {'results': {
+            'employees_get_page': {'median_ms': 10.0, 'queries': 2},
+            'employees_post': {'median_ms': 5.0, 'queries': 3}}}
+
+    def test_no_regressions(self):
+        new = {'results': {
+            'employees_get_page': {'median_ms': 11.0, 'queries': 2},
+            'employees_post': {'median_ms': 4.0, 'queries': 3},
+            'employees_put': {'median_ms': 50.0, 'queries': 9}}}
+
+        actual_result = regressions(self.old, new, 0.2)
+        expected_result = []
+        self.assertEqual(actual_result, expected_result)
+
+    def test_regressions(self):
+        new = {'results': {
+            'employees_get_page': {'median_ms': 13.0, 'queries': 2},
+            'employees_post': {'median_ms': 5.0, 'queries': 4}}}
+
+        actual_result = regressions(self.old, new, 0.2)
+        expected_result = [
+            'employees_get_page: 10.00 ms -> 13.00 ms (1.30x)',
+            'employees_post: 3.0 -> 4.0 queries']
+        self.assertEqual(actual_result, expected_result)
@@ -0,0 +1,32 @@
+import unittest
+
+from dmms.benchmarks.seed import seed
+from dmms.rest.app import app
+from dmms.service.db import db
+from dmms.models.model import DepartmentsModel
+
+
+class SeedTest(unittest.TestCase):
+    """Test seeding of benchmark dataset"""
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add(DepartmentsModel(name='Test1'))
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_other_database_is_kept(self):
+        with self.assertRaises(RuntimeError):
+            seed(10, 2)
+
+        actual_names = [department.name
+                        for department in DepartmentsModel.query]
+        expected_names = ['Test1']
+        self.assertEqual(actual_names, expected_names)
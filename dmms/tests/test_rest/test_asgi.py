@@ -0,0 +1,111 @@
+import unittest
+
+from dmms.rest.app import app
+from dmms.service.db import db
+from dmms.models.model import DepartmentsModel, EmployeesModel
+
+# async variant needs optional starlette and databases packages
+try:
+    from starlette.testclient import TestClient
+    from dmms.rest.asgi import app as asgi_app
+except ImportError:
+    asgi_app = None
+
+
+@unittest.skipIf(asgi_app is None, 'starlette or databases not installed')
+class AsgiRestTest(unittest.TestCase):
+    """Test async reads give the same responses as WSGI app"""
+
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Test1')
+        test_department2 = DepartmentsModel(name='Test2')
+        test_employee1 = EmployeesModel(name='Employee1',
+                                        date_of_birth='1991-01-09',
+                                        salary=2500,
+                                        department_id=1)
+        test_employee2 = EmployeesModel(name='Employee2',
+                                        date_of_birth='1995-07-15',
+                                        salary=1500,
+                                        department_id=2)
+        db.session.add_all([test_department1, test_department2,
+                            test_employee1, test_employee2])
+        db.session.commit()
+        self.client = TestClient(asgi_app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        """Drop test tables"""
+        self.client.__exit__(None, None, None)
+        db.session.remove()
+        db.drop_all()
+
+    def test_same_as_wsgi(self):
+        for path, params in (('/departments', {}),
+                             ('/departments', {'include': 'none',
+                                               'limit': '1'}),
+                             ('/departments', {'name': 'Test2'}),
+                             ('/departments', {'q': 'test', 'limit': '1',
+                                               'after': '1'}),
+                             ('/departments/summary', {}),
+                             ('/employees', {'id': ['2']}),
+                             ('/employees', {'include': 'department_name'}),
+                             ('/employees', {'q': 'ee2',
+                                             'include': 'department_name'}),
+                             ('/employees', {'department_id': '1',
+                                             'sort': '-salary',
+                                             'salary_min': '1000'}),
+                             ('/employees', {'limit': '-1'})):
+            with self.subTest(path=path, params=params):
+                response = self.client.get(path, params=params)
+                wsgi_response = app.test_client().get(path,
+                                                      query_string=params)
+                actual_result = (response.status_code, response.json(),
+                                 response.headers.get('ETag'))
+                expected_result = (wsgi_response.status_code,
+                                   wsgi_response.json,
+                                   wsgi_response.headers.get('ETag'))
+                self.assertEqual(actual_result, expected_result)
+
+    def test_not_modified(self):
+        etag = self.client.get('/employees').headers['ETag']
+        for if_none_match, expected_code in (
+                (etag, 304), (f'"other", {etag}', 304), ('*', 304),
+                (f'W/{etag}', 304), (f'"x{etag[1:]}', 200)):
+            with self.subTest(if_none_match=if_none_match):
+                response = self.client.get(
+                    '/employees', headers={'If-None-Match': if_none_match})
+                wsgi_response = app.test_client().get(
+                    '/employees', headers={'If-None-Match': if_none_match})
+                actual_codes = (response.status_code,
+                                wsgi_response.status_code)
+                expected_codes = (expected_code, expected_code)
+                self.assertEqual(actual_codes, expected_codes)
+
+    def test_sorted_pages(self):
+        for sort in ('date_of_birth', '-salary'):
+            first_page = self.client.get('/employees',
+                                         params={'sort': sort, 'limit': '1'})
+            cursor = first_page.headers['X-Next-Cursor']
+            for name, params in (('test_next_page', {'sort': sort}),
+                                 ('test_other_sort', {'sort': 'name'})):
+                with self.subTest(sort=sort, name=name):
+                    params = dict(params, limit='1', after=cursor)
+                    response = self.client.get('/employees', params=params)
+                    wsgi_response = app.test_client().get(
+                        '/employees', query_string=params)
+                    actual_result = (response.status_code, response.json())
+                    expected_result = (wsgi_response.status_code,
+                                       wsgi_response.json)
+                    self.assertEqual(actual_result, expected_result)
+
+    def test_write_is_passed_to_wsgi(self):
+        response = self.client.post('/departments', json={'name': 'Test3'})
+
+        actual_value = response.json()
+        expected_value = 'New department Test3 with id 3 was added'
+        self.assertEqual(actual_value, expected_value)
@@ -1,9 +1,38 @@
+import json
 import unittest
+from datetime import date
+from threading import Thread
+from unittest import mock
+
 from flask import url_for
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 
-from dmms.rest.app import app
+from dmms.rest.app import app, create_app
+from dmms.service.config import TestConfig
 from dmms.service.db import db
 from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.cache import LRUBackend, RedisBackend, response_cache
+from dmms.service.metrics import MAX_LOGGED_PARAMETERS, logged_parameters
+from dmms.service.query_plan import explain, uses_index
+from dmms.service.resources import departments_summary_query, employees_query
+
+
+class QueryCounter:
+    """Count SQL queries executed by database engine"""
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self.callback)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(db.engine, 'before_cursor_execute', self.callback)
+
+    def callback(self, *args):
+        self.count += 1
 
 
 class DepartmentsRestTest(unittest.TestCase):
@@ -50,6 +79,38 @@ class DepartmentsRestTest(unittest.TestCase):
                            {'id': 3, 'name': 'Test3', 'employees': []}]
         self.assertEqual(actual_result, expected_result)
 
+    def test_get_departments_without_employees(self):
+        response = app.test_client().get(
+            url_for('departments'), query_string={'include': 'none'})
+
+        actual_result = response.json
+        expected_result = [{'id': 1, 'name': 'Test1'},
+                           {'id': 2, 'name': 'Test2'},
+                           {'id': 3, 'name': 'Test3'}]
+        self.assertEqual(actual_result, expected_result)
+
+    def test_get_departments_query_count(self):
+        def add_departments(names):
+            for name in names:
+                department = DepartmentsModel(name=name)
+                department.employees.append(EmployeesModel(
+                    name=f'Employee_{name}', date_of_birth='1991-01-09',
+                    salary=1000))
+                db.session.add(department)
+            db.session.commit()
+
+        def count_queries():
+            db.session.remove()
+            with QueryCounter() as counter:
+                app.test_client().get(url_for('departments'))
+            return counter.count
+
+        add_departments(['Test4'])
+        actual_count = count_queries()
+        add_departments([f'Test{i}' for i in range(5, 15)])
+        expected_count = count_queries()
+        self.assertEqual(actual_count, expected_count)
+
     def test_get_wrong_url_departments(self):
         response = app.test_client().get(
             url_for('departments', department_id=42))
@@ -87,6 +148,22 @@ class DepartmentsRestTest(unittest.TestCase):
             expected_was = [{'id': 4, 'name': 'Test4', 'employees': []}]
             self.assertEqual(actual_was, expected_was)
 
+    def test_post_many_departments(self):
+        response = app.test_client().post(
+            url_for('departments'),
+            headers={'Content-Type': 'application/json'},
+            data='[{"name": "Test4"}, {"name": "Test5"}]')
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = [{'index': 0, 'id': 4}, {'index': 1, 'id': 5}]
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 201
+            self.assertEqual(actual_code, expected_code)
+
     def test_post_wrong_url_departments(self):
         response = app.test_client().post(
             url_for('departments', department_id=42),
@@ -193,6 +270,33 @@ class DepartmentsRestTest(unittest.TestCase):
             expected_code = 404
             self.assertEqual(actual_code, expected_code)
 
+    def test_post_existing_departments(self):
+        response = app.test_client().post(
+            url_for('departments'),
+            headers={'Content-Type': 'application/json'},
+            data='{"name": "Test1"}')
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = 'Department Test1 already exists'
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 409
+            self.assertEqual(actual_code, expected_code)
+
+    def test_department_lookups_use_indexes(self):
+        with self.subTest('test_name_index'):
+            plan = explain(DepartmentsModel.query.filter(
+                DepartmentsModel.name == 'Test1'))
+            self.assertTrue(uses_index(plan, 'ix_departments_name'))
+
+        with self.subTest('test_department_id_index'):
+            plan = explain(EmployeesModel.query.filter(
+                EmployeesModel.department_id.in_([1, 2])))
+            self.assertTrue(uses_index(plan, 'ix_employees_department_id'))
+
     def test_delete_departments(self):
         response = app.test_client().delete(
             url_for('departments', department_id=3))
@@ -333,6 +437,144 @@ class EmployeesRestTest(unittest.TestCase):
                               'department_id': 1}]
             self.assertEqual(actual_same, expected_same)
 
+    def test_get_employees_with_department_name(self):
+        response = app.test_client().get(
+            url_for('employees'),
+            query_string={'id': ['2', '3'], 'include': 'department_name'})
+
+        actual_result = response.json
+        expected_result = [{'id': 2, 'name': 'Employee2',
+                            'date_of_birth': '1995-07-15', 'salary': 1500,
+                            'department_id': 1, 'department_name': 'Test1'},
+                           {'id': 3, 'name': 'Employee3',
+                            'date_of_birth': '1981-01-09', 'salary': 2000,
+                            'department_id': 2, 'department_name': 'Test2'}]
+        self.assertEqual(actual_result, expected_result)
+
+    def test_get_employees_pages(self):
+        response = app.test_client().get(
+            url_for('employees'), query_string={'limit': 2})
+
+        with self.subTest('test_first_page'):
+            actual_ids = [employee['id'] for employee in response.json]
+            expected_ids = [1, 2]
+            self.assertEqual(actual_ids, expected_ids)
+
+        with self.subTest('test_next_cursor'):
+            actual_cursor = response.headers['X-Next-Cursor']
+            expected_cursor = '2'
+            self.assertEqual(actual_cursor, expected_cursor)
+            self.assertIn('rel="next"', response.headers['Link'])
+
+        with self.subTest('test_last_page'):
+            response_last = app.test_client().get(
+                url_for('employees'), query_string={'limit': 2, 'after': 2})
+            actual_ids = [employee['id'] for employee in response_last.json]
+            expected_ids = [3]
+            self.assertEqual(actual_ids, expected_ids)
+            self.assertNotIn('X-Next-Cursor', response_last.headers)
+
+    def test_get_employees_max_page_size(self):
+        max_page_size = app.config['MAX_PAGE_SIZE']
+        app.config['MAX_PAGE_SIZE'] = 1
+        try:
+            response = app.test_client().get(
+                url_for('employees'), query_string={'limit': 100})
+        finally:
+            app.config['MAX_PAGE_SIZE'] = max_page_size
+
+        actual_ids = [employee['id'] for employee in response.json]
+        expected_ids = [1]
+        self.assertEqual(actual_ids, expected_ids)
+
+    def test_get_employees_by_wrong_birthday(self):
+        response = app.test_client().get(
+            url_for('employees'),
+            query_string={'date_of_birth_start': '1990-13-01'})
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = {'message': {
+                'date_of_birth_start': "'1990-13-01' is not a valid date. "
+                                       "Please use YYYY-MM-DD format"}}
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 400
+            self.assertEqual(actual_code, expected_code)
+
+    def test_birthday_range_uses_index(self):
+        query = employees_query({'id': None,
+                                 'date_of_birth_start': date(1990, 1, 1),
+                                 'date_of_birth_end': date(2000, 1, 1)})
+
+        plan = explain(query)
+        self.assertTrue(uses_index(plan, 'ix_employees_date_of_birth'))
+
+    def test_get_employees_not_modified(self):
+        etag = app.test_client().get(url_for('employees')).headers['ETag']
+
+        with self.subTest('test_not_modified'):
+            with QueryCounter() as counter:
+                response = app.test_client().get(
+                    url_for('employees'), headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            # only versions of tables are read
+            self.assertEqual(counter.count, 1)
+
+        with self.subTest('test_other_args'):
+            response = app.test_client().get(
+                url_for('employees'), query_string={'id': ['1']},
+                headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+
+        with self.subTest('test_modified'):
+            app.test_client().put(
+                url_for('employees', employee_id=3),
+                headers={'Content-Type': 'application/json'},
+                data='{"salary": 999}')
+            response = app.test_client().get(
+                url_for('employees'), headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_export_employees_ndjson(self):
+        response = app.test_client().get(
+            url_for('employeesexport'),
+            query_string={'date_of_birth_start': '1990-01-01'})
+        with self.subTest('test_response_type'):
+            actual_type = response.mimetype
+            expected_type = 'application/x-ndjson'
+            self.assertEqual(actual_type, expected_type)
+
+        with self.subTest('test_response_value'):
+            actual_value = [json.loads(line) for line
+                            in response.get_data(as_text=True).splitlines()]
+            expected_value = [{'id': 1, 'name': 'Employee1',
+                               'date_of_birth': '1991-01-09', 'salary': 2500,
+                               'department_id': 1},
+                              {'id': 2, 'name': 'Employee2',
+                               'date_of_birth': '1995-07-15', 'salary': 1500,
+                               'department_id': 1}]
+            self.assertEqual(actual_value, expected_value)
+
+    def test_export_employees_csv(self):
+        response = app.test_client().get(
+            url_for('employeesexport'), query_string={'format': 'csv'})
+        with self.subTest('test_response_type'):
+            actual_type = response.mimetype
+            expected_type = 'text/csv'
+            self.assertEqual(actual_type, expected_type)
+
+        with self.subTest('test_response_value'):
+            actual_value = response.get_data(as_text=True).splitlines()
+            expected_value = ['id,name,date_of_birth,salary,department_id',
+                              '1,Employee1,1991-01-09,2500.0,1',
+                              '2,Employee2,1995-07-15,1500.0,1',
+                              '3,Employee3,1981-01-09,2000.0,2']
+            self.assertEqual(actual_value, expected_value)
+
     def test_get_wrong_url_employees(self):
         response = app.test_client().get(
             url_for('employees', employee_id=42))
@@ -373,6 +615,116 @@ class EmployeesRestTest(unittest.TestCase):
                              'department_id': 2}]
             self.assertEqual(actual_was, expected_was)
 
+    def test_post_many_employees(self):
+        response = app.test_client().post(
+            url_for('employees'),
+            headers={'Content-Type': 'application/json'},
+            data='[{"name": "Employee4", "date_of_birth": "1996-04-05", '
+                 '"salary": 1000, "department_id": 2}, '
+                 '{"name": "Employee5", "date_of_birth": "1997-04-05", '
+                 '"salary": 1100, "department_id": 1}]')
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = [{'index': 0, 'id': 4}, {'index': 1, 'id': 5}]
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 201
+            self.assertEqual(actual_code, expected_code)
+
+        with self.subTest(name='test_if_really_was_posted'):
+            response_was = app.test_client().get(
+                url_for('employees'), query_string={'id': ['4', '5']})
+            actual_was = [employee['name'] for employee in response_was.json]
+            expected_was = ['Employee4', 'Employee5']
+            self.assertEqual(actual_was, expected_was)
+
+    def test_post_many_employees_by_chunks(self):
+        db.session.delete(EmployeesModel.query.get(3))
+        db.session.commit()
+        inserts = []
+
+        def count_insert(conn, cursor, statement, *args):
+            if statement.startswith('INSERT INTO employees '):
+                inserts.append(statement)
+
+        chunk_size = app.config['BULK_INSERT_CHUNK_SIZE']
+        app.config['BULK_INSERT_CHUNK_SIZE'] = 2
+        event.listen(db.engine, 'before_cursor_execute', count_insert)
+        try:
+            response = app.test_client().post(url_for('employees'), json=[
+                {'name': f'Employee{number}', 'date_of_birth': '1996-04-05',
+                 'salary': 1000, 'department_id': 2}
+                for number in range(4, 9)])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_insert)
+            app.config['BULK_INSERT_CHUNK_SIZE'] = chunk_size
+
+        with self.subTest('test_inserts'):
+            actual_count = len(inserts)
+            expected_count = 3
+            self.assertEqual(actual_count, expected_count)
+
+        with self.subTest('test_ids_of_items'):
+            ids = [item['id'] for item in response.json]
+            actual_names = [EmployeesModel.query.get(item_id).name
+                            for item_id in ids]
+            expected_names = [f'Employee{number}' for number in range(4, 9)]
+            self.assertEqual(actual_names, expected_names)
+
+    def test_post_many_wrong_employees(self):
+        response = app.test_client().post(
+            url_for('employees'),
+            headers={'Content-Type': 'application/json'},
+            data='[{"name": "Employee4", "date_of_birth": "1996-04-05", '
+                 '"salary": 1000, "department_id": 2}, '
+                 '{"name": "Employee5", "date_of_birth": "1997-04-05", '
+                 '"salary": -1100, "department_id": 1}, '
+                 '{"name": "Employee6"}]')
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = [
+                {'index': 1, 'message': 'Please provide higher then zero '
+                                        'value for salary'},
+                {'index': 2, 'message': "You haven't pass these "
+                                        "parameters: ['date_of_birth', "
+                                        "'salary', 'department_id']"}]
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 400
+            self.assertEqual(actual_code, expected_code)
+
+        with self.subTest(name='test_if_nothing_was_posted'):
+            response_was = app.test_client().get(url_for('employees'))
+            actual_was = len(response_was.json)
+            expected_was = 3
+            self.assertEqual(actual_was, expected_was)
+
+    def test_post_too_many_employees(self):
+        max_batch_size = app.config['MAX_BATCH_SIZE']
+        app.config['MAX_BATCH_SIZE'] = 1
+        try:
+            response = app.test_client().post(
+                url_for('employees'), json=[{}, {}])
+        finally:
+            app.config['MAX_BATCH_SIZE'] = max_batch_size
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = {'message': 'Please provide not more than 1 '
+                                         'items'}
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 413
+            self.assertEqual(actual_code, expected_code)
+
     def test_post_wrong_url_employees(self):
         response = app.test_client().post(
             url_for('employees', employee_id=42),
@@ -452,6 +804,53 @@ class EmployeesRestTest(unittest.TestCase):
                              'department_id': 2}]
             self.assertEqual(actual_was, expected_was)
 
+    def test_patch_many_employees(self):
+        chunk_size = app.config['BULK_CHUNK_SIZE']
+        app.config['BULK_CHUNK_SIZE'] = 1
+        try:
+            response = app.test_client().patch(
+                url_for('employees'),
+                headers={'Content-Type': 'application/json'},
+                data='{"ids": [1, 3, 42], "set": {"salary": 3000}}')
+        finally:
+            app.config['BULK_CHUNK_SIZE'] = chunk_size
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = {'message': "Employees were updated with "
+                                         "data {'salary': 3000.0}",
+                              'missing': [42]}
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 200
+            self.assertEqual(actual_code, expected_code)
+
+        with self.subTest('test_if_really_was_updated'):
+            response_was = app.test_client().get(url_for('employees'))
+            actual_was = [employee['salary'] for employee
+                          in response_was.json]
+            expected_was = [3000, 1500, 3000]
+            self.assertEqual(actual_was, expected_was)
+
+    def test_patch_salary_is_positive_employees(self):
+        response = app.test_client().patch(
+            url_for('employees'),
+            headers={'Content-Type': 'application/json'},
+            data='{"ids": [1, 3], "set": {"salary": -3000}}')
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = {'message': 'Please provide higher then zero '
+                                         'value for salary'}
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 406
+            self.assertEqual(actual_code, expected_code)
+
     def test_put_value_provided_employees(self):
         response = app.test_client().put(
             url_for('employees'),
@@ -543,6 +942,30 @@ class EmployeesRestTest(unittest.TestCase):
                              'department_id': 1}]
             self.assertEqual(actual_was, expected_was)
 
+    def test_delete_many_employees(self):
+        response = app.test_client().delete(
+            url_for('employees'),
+            headers={'Content-Type': 'application/json'},
+            data='{"ids": [1, 2, 42]}')
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = {'message': 'Employees were successfully '
+                                         'deleted',
+                              'missing': [42]}
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 200
+            self.assertEqual(actual_code, expected_code)
+
+        with self.subTest('test_if_really_was_deleted'):
+            response_was = app.test_client().get(url_for('employees'))
+            actual_was = [employee['id'] for employee in response_was.json]
+            expected_was = [3]
+            self.assertEqual(actual_was, expected_was)
+
     def test_delete_value_provided_employees(self):
         response = app.test_client().delete(url_for('employees'))
 
@@ -569,3 +992,693 @@ class EmployeesRestTest(unittest.TestCase):
             actual_code = response.status_code
             expected_code = 404
             self.assertEqual(actual_code, expected_code)
+
+
+class DepartmentsSummaryRestTest(unittest.TestCase):
+    """Test Departments summary API"""
+
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Test1')
+        test_department2 = DepartmentsModel(name='Test2')
+        test_employee1 = EmployeesModel(name='Employee1',
+                                        date_of_birth='1991-01-09',
+                                        salary=2500,
+                                        department_id=1)
+        test_employee2 = EmployeesModel(name='Employee2',
+                                        date_of_birth='1995-07-15',
+                                        salary=1500,
+                                        department_id=1)
+        db.session.add_all([test_department1, test_department2,
+                            test_employee1, test_employee2])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_get_departments_summary(self):
+        response = app.test_client().get(url_for('departmentssummary'))
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = [{'id': 1, 'name': 'Test1', 'headcount': 2,
+                               'salary_sum': 4000, 'salary_avg': 2000,
+                               'salary_min': 1500, 'salary_max': 2500},
+                              {'id': 2, 'name': 'Test2', 'headcount': 0,
+                               'salary_sum': None, 'salary_avg': None,
+                               'salary_min': None, 'salary_max': None}]
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 200
+            self.assertEqual(actual_code, expected_code)
+
+    def test_summary_reads_counters(self):
+        DepartmentsModel.query.filter_by(id=2).update(
+            {'headcount': 1, 'salary_sum': 700})
+        db.session.commit()
+
+        response = app.test_client().get(url_for('departmentssummary'))
+
+        actual_value = response.json[1]
+        expected_value = {'id': 2, 'name': 'Test2', 'headcount': 1,
+                          'salary_sum': 700, 'salary_avg': 700,
+                          'salary_min': None, 'salary_max': None}
+        self.assertEqual(actual_value, expected_value)
+
+    def test_summary_uses_index(self):
+        plan = explain(departments_summary_query())
+
+        self.assertTrue(uses_index(plan, 'ix_employees_department_id_salary'))
+
+
+class ResponseCacheRestTest(unittest.TestCase):
+    """Test cache of GET responses"""
+
+    def setUp(self):
+        """Create and fill test tables, turn on cache"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Test1')
+        test_employee1 = EmployeesModel(name='Employee1',
+                                        date_of_birth='1991-01-09',
+                                        salary=2500,
+                                        department_id=1)
+        db.session.add_all([test_department1, test_employee1])
+        db.session.commit()
+        response_cache.backend = LRUBackend(max_size=16, ttl=60)
+        response_cache.hits = response_cache.misses = 0
+
+    def tearDown(self):
+        """Drop test tables, turn off cache"""
+        response_cache.backend = None
+        db.session.remove()
+        db.drop_all()
+
+    def test_get_cached(self):
+        app.test_client().get(url_for('employees'))
+        response = app.test_client().get(url_for('employees'))
+
+        with self.subTest('test_response_value'):
+            actual_value = [employee['id'] for employee in response.json]
+            expected_value = [1]
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_counters'):
+            stats = app.test_client().get(url_for('cachestats')).json
+            actual_counters = (stats['hits'], stats['misses'])
+            expected_counters = (1, 1)
+            self.assertEqual(actual_counters, expected_counters)
+
+    def test_write_invalidates(self):
+        app.test_client().get(url_for('departmentssummary'))
+        app.test_client().get(url_for('departments'),
+                              query_string={'include': 'none'})
+        app.test_client().post(
+            url_for('employees'),
+            headers={'Content-Type': 'application/json'},
+            data='{"name": "Employee2", "date_of_birth":"1996-04-05", '
+                 '"salary":1500, "department_id": 1}')
+
+        with self.subTest('test_dependent_response_is_updated'):
+            response = app.test_client().get(url_for('departmentssummary'))
+            actual_value = response.json[0]['headcount']
+            expected_value = 2
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_independent_response_is_cached'):
+            app.test_client().get(url_for('departments'),
+                                  query_string={'include': 'none'})
+            actual_counters = (response_cache.hits, response_cache.misses)
+            expected_counters = (1, 3)
+            self.assertEqual(actual_counters, expected_counters)
+
+    def test_counters_of_threads(self):
+        cache = app.extensions['response_cache']
+
+        def read():
+            for number in range(1000):
+                cache.get_or_set('test', {'number': number % 10}, {},
+                                 lambda: 'value')
+
+        threads = [Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        actual_count = cache.hits + cache.misses
+        expected_count = 8000
+        self.assertEqual(actual_count, expected_count)
+
+    def test_cached_link_follows_request(self):
+        db.session.add(DepartmentsModel(name='Test2'))
+        db.session.commit()
+        app.test_client().get('/departments', query_string={'limit': 1})
+        response = app.test_client().get(
+            '/departments', query_string={'limit': 1},
+            base_url='http://localhost:5000/api')
+
+        with self.subTest('test_response_is_cached'):
+            self.assertEqual(response_cache.hits, 1)
+
+        with self.subTest('test_link_of_request'):
+            actual_link = response.headers['Link']
+            expected_link = '<http://localhost:5000/api/departments' \
+                            '?limit=1&after=1>; rel="next"'
+            self.assertEqual(actual_link, expected_link)
+
+    def test_redis_size_counts_cache_keys(self):
+        backend = RedisBackend.__new__(RedisBackend)
+        backend.client = mock.Mock()
+        backend.client.scan_iter.return_value = iter([b'cache:a',
+                                                      b'cache:b'])
+
+        with self.subTest('test_size'):
+            self.assertEqual(backend.size(), 2)
+
+        with self.subTest('test_pattern'):
+            backend.client.scan_iter.assert_called_once_with('cache:*')
+
+
+class RequestMetricsRestTest(unittest.TestCase):
+    """Test per request SQL instrumentation and metrics"""
+
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Test1')
+        db.session.add(test_department1)
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        app.config['SLOW_QUERY_MS'] = TestConfig.SLOW_QUERY_MS
+        db.session.remove()
+        db.drop_all()
+
+    def test_timing_headers(self):
+        with QueryCounter() as counter:
+            response = app.test_client().get(
+                url_for('departments'), query_string={'include': 'none'})
+
+        with self.subTest('test_query_count'):
+            actual_count = int(response.headers['X-Query-Count'])
+            expected_count = counter.count
+            self.assertEqual(actual_count, expected_count)
+
+        with self.subTest('test_server_timing'):
+            actual_names = [metric.split(';')[0] for metric
+                            in response.headers['Server-Timing'].split(', ')]
+            expected_names = ['db', 'app']
+            self.assertEqual(actual_names, expected_names)
+
+    def test_metrics(self):
+        app.test_client().get(url_for('departments'))
+        response = app.test_client().get(url_for('metrics'))
+        labels = 'app="dmms.rest.app",endpoint="/departments",method="GET"'
+
+        with self.subTest('test_histogram'):
+            self.assertIn(f'dmms_request_duration_seconds_bucket'
+                          f'{{{labels},le="+Inf"}}',
+                          response.get_data(as_text=True))
+
+        with self.subTest('test_queries'):
+            self.assertIn(f'dmms_request_queries_total{{{labels}}}',
+                          response.get_data(as_text=True))
+
+    def test_slow_query_log(self):
+        app.config['SLOW_QUERY_MS'] = 0
+        with self.assertLogs(app.logger, 'WARNING') as logs:
+            app.test_client().get(url_for('departments'),
+                                  query_string={'name': 'Test1'})
+        self.assertTrue(any('Slow query' in line and "'Test1'" in line
+                            for line in logs.output))
+
+    def test_logged_parameters(self):
+        long_name = 'a' * 1000
+        for name, parameters, expected_text in (
+                ('test_row', ('Test1', 1), "('Test1', 1)"),
+                ('test_rows', [{'name': 'Test1'}, {'name': 'Test2'}],
+                 "{'name': 'Test1'} ... (2 rows)"),
+                ('test_long_row', (long_name,),
+                 f"('{long_name[:MAX_LOGGED_PARAMETERS - 2]}..."),
+                ('test_long_rows', [(long_name,)] * 3,
+                 f"('{long_name[:MAX_LOGGED_PARAMETERS - 2]}... "
+                 f"... (3 rows)")):
+            with self.subTest(name=name):
+                actual_text = logged_parameters(parameters)
+                self.assertEqual(actual_text, expected_text)
+
+    def test_failed_query(self):
+        with db.engine.connect() as connection:
+            with self.assertRaises(OperationalError):
+                connection.execute('SELECT * FROM missing_table')
+
+            actual_starts = connection.info.get('query_start')
+            expected_starts = []
+            self.assertEqual(actual_starts, expected_starts)
+
+
+class HealthRestTest(unittest.TestCase):
+    """Test readiness check"""
+
+    def setUp(self):
+        """Create test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_health(self):
+        response = app.test_client().get(url_for('health'))
+
+        actual_result = (response.status_code, response.json)
+        expected_result = (200, {'status': 'ok', 'database': 'ok'})
+        self.assertEqual(actual_result, expected_result)
+
+    def test_database_unavailable(self):
+        error = OperationalError('SELECT 1', {}, Exception('gone away'))
+        with mock.patch.object(db.session, 'execute', side_effect=error):
+            response = app.test_client().get(url_for('health'))
+
+        actual_result = (response.status_code, response.json)
+        expected_result = (503, {'status': 'unavailable',
+                                 'database': 'gone away'})
+        self.assertEqual(actual_result, expected_result)
+
+
+class AppFactoryRestTest(unittest.TestCase):
+    """Test creation of REST service app"""
+
+    def test_create_app_without_queries(self):
+        queries = []
+
+        def count_query(*args):
+            queries.append(args)
+
+        event.listen(Engine, 'before_cursor_execute', count_query)
+        try:
+            created_app = create_app(TestConfig)
+        finally:
+            event.remove(Engine, 'before_cursor_execute', count_query)
+
+        with self.subTest('test_no_queries'):
+            self.assertEqual(queries, [])
+
+        with self.subTest('test_routes'):
+            actual_rules = {rule.rule for rule
+                            in created_app.url_map.iter_rules()}
+            expected_rules = {'/departments', '/departments/summary',
+                              '/employees', '/employees/export', '/health'}
+            self.assertTrue(expected_rules <= actual_rules)
+
+    def test_apps_keep_own_extensions(self):
+        config = type('CachedConfig', (TestConfig,), {'CACHE_BACKEND': 'lru'})
+        created_app = create_app(config)
+
+        for name in ('response_cache', 'request_metrics'):
+            with self.subTest(name=name):
+                self.assertIsNot(created_app.extensions[name],
+                                 app.extensions[name])
+
+        with self.subTest('test_cache_backends'):
+            actual_backends = (
+                created_app.extensions['response_cache'].backend.name,
+                app.extensions['response_cache'].backend)
+            expected_backends = ('lru', None)
+            self.assertEqual(actual_backends, expected_backends)
+
+
+class SearchRestTest(unittest.TestCase):
+    """Test search of employees and departments by name"""
+
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Wholesale')
+        test_department2 = DepartmentsModel(name='Sales')
+        test_department3 = DepartmentsModel(name='Sale')
+        test_employee1 = EmployeesModel(name='Anna Smith',
+                                        date_of_birth='1991-01-09',
+                                        salary=2500,
+                                        department_id=1)
+        test_employee2 = EmployeesModel(name='Smith',
+                                        date_of_birth='1995-07-15',
+                                        salary=1500,
+                                        department_id=2)
+        test_employee3 = EmployeesModel(name='John Smithson',
+                                        date_of_birth='1989-03-21',
+                                        salary=3000,
+                                        department_id=2)
+        test_employee4 = EmployeesModel(name='Bob Jones',
+                                        date_of_birth='1990-11-02',
+                                        salary=2000,
+                                        department_id=3)
+        db.session.add_all([test_department1, test_department2,
+                            test_department3, test_employee1,
+                            test_employee2, test_employee3,
+                            test_employee4])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_search_employees_ranked(self):
+        for q, expected_ids in (('smith', [2, 1, 3]),
+                                ('SMITHSON', [3]),
+                                ('jo', [3, 4]),
+                                ('%', []),
+                                ('nobody', [])):
+            with self.subTest(q=q):
+                response = app.test_client().get(url_for('employees'),
+                                                 query_string={'q': q})
+                actual_ids = [employee['id'] for employee in response.json]
+                self.assertEqual(actual_ids, expected_ids)
+
+    def test_search_departments_ranked(self):
+        response = app.test_client().get(
+            url_for('departments'),
+            query_string={'q': 'sale', 'include': 'none'})
+
+        actual_value = response.json
+        expected_value = [{'id': 3, 'name': 'Sale'},
+                          {'id': 2, 'name': 'Sales'},
+                          {'id': 1, 'name': 'Wholesale'}]
+        self.assertEqual(actual_value, expected_value)
+
+    def test_search_with_other_filters(self):
+        response = app.test_client().get(
+            url_for('employees'),
+            query_string={'q': 'smith', 'date_of_birth_start': '1990-01-01',
+                          'date_of_birth_end': '1999-12-31',
+                          'include': 'department_name'})
+
+        actual_value = [(employee['name'], employee['department_name'])
+                        for employee in response.json]
+        expected_value = [('Smith', 'Sales'), ('Anna Smith', 'Wholesale')]
+        self.assertEqual(actual_value, expected_value)
+
+    def test_search_pages(self):
+        first_page = app.test_client().get(
+            url_for('employees'), query_string={'q': 'smith', 'limit': 2})
+        cursor = first_page.headers['X-Next-Cursor']
+        second_page = app.test_client().get(
+            url_for('employees'),
+            query_string={'q': 'smith', 'limit': 2, 'after': cursor})
+
+        with self.subTest('test_cursor_is_offset'):
+            self.assertEqual(cursor, '2')
+
+        with self.subTest('test_pages'):
+            actual_pages = ([employee['id'] for employee in first_page.json],
+                            [employee['id'] for employee in second_page.json])
+            expected_pages = ([2, 1], [3])
+            self.assertEqual(actual_pages, expected_pages)
+
+        with self.subTest('test_last_page_has_no_cursor'):
+            self.assertNotIn('X-Next-Cursor', second_page.headers)
+
+    def test_index_follows_writes(self):
+        app.test_client().put(
+            url_for('employees', employee_id=4),
+            headers={'Content-Type': 'application/json'},
+            data='{"name": "Bob Smithers"}')
+        app.test_client().delete(url_for('employees', employee_id=1))
+
+        response = app.test_client().get(url_for('employees'),
+                                         query_string={'q': 'smith'})
+        actual_ids = [employee['id'] for employee in response.json]
+        expected_ids = [2, 4, 3]
+        self.assertEqual(actual_ids, expected_ids)
+
+
+class SalaryStatsRestTest(unittest.TestCase):
+    """Test salary statistics API"""
+
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Test1')
+        test_department2 = DepartmentsModel(name='Test2')
+        test_employee1 = EmployeesModel(name='Employee1',
+                                        date_of_birth='1991-01-09',
+                                        salary=1000,
+                                        department_id=1)
+        test_employee2 = EmployeesModel(name='Employee2',
+                                        date_of_birth='1995-07-15',
+                                        salary=3000,
+                                        department_id=1)
+        test_employee3 = EmployeesModel(name='Employee3',
+                                        date_of_birth='1989-03-21',
+                                        salary=5000,
+                                        department_id=2)
+        db.session.add_all([test_department1, test_department2,
+                            test_employee1, test_employee2,
+                            test_employee3])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_get_company_salary_stats(self):
+        response = app.test_client().get(url_for('salarystats'),
+                                         query_string={'buckets': 2})
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json
+            expected_value = {
+                'count': 3, 'mean': 3000.0,
+                'stddev': response.json['stddev'],
+                'min': 1000.0, 'max': 5000.0,
+                'p10': 1400.0, 'p50': 3000.0, 'p90': 4600.0,
+                'histogram': [{'from': 1000.0, 'to': 3000.0, 'count': 1},
+                              {'from': 3000.0, 'to': 5000.0, 'count': 2}]}
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_stddev'):
+            self.assertAlmostEqual(response.json['stddev'],
+                                   (8000000 / 3) ** 0.5)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 200
+            self.assertEqual(actual_code, expected_code)
+
+    def test_get_department_salary_stats(self):
+        response = app.test_client().get(
+            url_for('salarystats', department_id=1))
+
+        with self.subTest('test_response_value'):
+            actual_value = (response.json['count'], response.json['p50'],
+                            len(response.json['histogram']))
+            expected_value = (2, 2000.0, 10)
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 200
+            self.assertEqual(actual_code, expected_code)
+
+    def test_get_salary_stats_wrong_department(self):
+        response = app.test_client().get(
+            url_for('salarystats', department_id=3))
+
+        actual_result = (response.status_code, response.json['message'])
+        expected_result = (404, "Department 3 doesn't exist")
+        self.assertEqual(actual_result, expected_result)
+
+    def test_get_salary_stats_wrong_buckets(self):
+        for buckets, expected_code in (('-1', 406), ('many', 400)):
+            with self.subTest(buckets=buckets):
+                response = app.test_client().get(
+                    url_for('salarystats'), query_string={'buckets': buckets})
+                self.assertEqual(response.status_code, expected_code)
+
+    def test_salary_stats_uses_index(self):
+        plan = explain(EmployeesModel.query.with_entities(
+            EmployeesModel.salary).filter(
+            EmployeesModel.department_id == 1).order_by(
+            EmployeesModel.salary))
+
+        self.assertTrue(uses_index(plan, 'ix_employees_department_id_salary'))
+
+
+class EmployeesFilterRestTest(unittest.TestCase):
+    """Test filters and sort order of employees"""
+
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Test1')
+        test_department2 = DepartmentsModel(name='Test2')
+        test_employee1 = EmployeesModel(name='Employee1',
+                                        date_of_birth='1991-01-09',
+                                        salary=2500,
+                                        department_id=1)
+        test_employee2 = EmployeesModel(name='Employee2',
+                                        date_of_birth='1995-07-15',
+                                        salary=1500,
+                                        department_id=1)
+        test_employee3 = EmployeesModel(name='Employee3',
+                                        date_of_birth='1989-03-21',
+                                        salary=3000,
+                                        department_id=1)
+        test_employee4 = EmployeesModel(name='Employee4',
+                                        date_of_birth='1993-11-02',
+                                        salary=2000,
+                                        department_id=2)
+        db.session.add_all([test_department1, test_department2,
+                            test_employee1, test_employee2,
+                            test_employee3, test_employee4])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_get_filtered_employees(self):
+        for params, expected_ids in (
+                ({'department_id': 1}, [1, 2, 3]),
+                ({'department_id': 3}, []),
+                ({'salary_min': 2000}, [1, 3, 4]),
+                ({'salary_max': 2000}, [2, 4]),
+                ({'salary_min': 1500, 'salary_max': 2500}, [1, 2, 4]),
+                ({'department_id': 1, 'date_of_birth_start': '1990-01-01',
+                  'date_of_birth_end': '1999-12-31'}, [1, 2]),
+                ({'department_id': 1, 'salary_max': 2500}, [1, 2])):
+            with self.subTest(params=params):
+                response = app.test_client().get(url_for('employees'),
+                                                 query_string=params)
+                actual_ids = [employee['id'] for employee in response.json]
+                self.assertEqual(actual_ids, expected_ids)
+
+    def test_get_sorted_employees(self):
+        for sort, expected_ids in (('id', [1, 2, 3, 4]),
+                                   ('-id', [4, 3, 2, 1]),
+                                   ('salary', [2, 4, 1, 3]),
+                                   ('-salary', [3, 1, 4, 2]),
+                                   ('date_of_birth', [3, 1, 4, 2]),
+                                   ('-name', [4, 3, 2, 1])):
+            with self.subTest(sort=sort):
+                response = app.test_client().get(url_for('employees'),
+                                                 query_string={'sort': sort})
+                actual_ids = [employee['id'] for employee in response.json]
+                self.assertEqual(actual_ids, expected_ids)
+
+    def test_get_sorted_employees_pages(self):
+        params = {'department_id': 1, 'sort': '-salary', 'limit': 2}
+        first_page = app.test_client().get(url_for('employees'),
+                                           query_string=params)
+        second_page = app.test_client().get(
+            url_for('employees'),
+            query_string=dict(params,
+                              after=first_page.headers['X-Next-Cursor']))
+
+        actual_pages = ([employee['id'] for employee in first_page.json],
+                        [employee['id'] for employee in second_page.json])
+        expected_pages = ([3, 1], [2])
+        self.assertEqual(actual_pages, expected_pages)
+
+    def test_sorted_pages_with_ties(self):
+        db.session.add_all([EmployeesModel(name='Employee2',
+                                           date_of_birth='1993-11-02',
+                                           salary=2000, department_id=2),
+                            EmployeesModel(name='Employee5',
+                                           date_of_birth='1991-01-09',
+                                           salary=2500, department_id=1)])
+        db.session.commit()
+        for sort in ('salary', '-salary', 'date_of_birth', '-date_of_birth',
+                     'name', '-name', '-id'):
+            with self.subTest(sort=sort):
+                actual_ids = []
+                params = {'sort': sort, 'limit': 2}
+                while True:
+                    response = app.test_client().get(url_for('employees'),
+                                                     query_string=params)
+                    actual_ids += [employee['id']
+                                   for employee in response.json]
+                    if 'X-Next-Cursor' not in response.headers:
+                        break
+                    params['after'] = response.headers['X-Next-Cursor']
+                expected_ids = [employee['id'] for employee
+                                in app.test_client().get(
+                                    url_for('employees'),
+                                    query_string={'sort': sort}).json]
+                self.assertEqual(actual_ids, expected_ids)
+
+    def test_sorted_pages_wrong_cursor(self):
+        cursor = app.test_client().get(
+            url_for('employees'),
+            query_string={'sort': 'salary', 'limit': 1}
+        ).headers['X-Next-Cursor']
+        for name, params in (('test_id_with_sort', {'sort': 'salary',
+                                                    'after': 1}),
+                             ('test_cursor_of_other_sort',
+                              {'sort': '-salary', 'after': cursor}),
+                             ('test_cursor_without_sort', {'after': cursor}),
+                             ('test_cursor_with_search',
+                              {'q': 'employee', 'after': cursor}),
+                             ('test_broken_cursor', {'sort': 'salary',
+                                                     'after': 'abc'}),
+                             ('test_broken_date', {
+                                 'sort': 'date_of_birth',
+                                 'after': 'WyJkYXRlX29mX2JpcnRoIiwieCIsMV0'})):
+            with self.subTest(name=name):
+                response = app.test_client().get(url_for('employees'),
+                                                 query_string=params)
+                actual_result = (response.status_code,
+                                 list(response.json['message']))
+                expected_result = (400, ['after'])
+                self.assertEqual(actual_result, expected_result)
+
+    def test_get_employees_wrong_sort(self):
+        response = app.test_client().get(url_for('employees'),
+                                         query_string={'sort': 'password'})
+
+        actual_code = response.status_code
+        expected_code = 400
+        self.assertEqual(actual_code, expected_code)
+
+    def test_department_filters_use_indexes(self):
+        args = {'id': None, 'date_of_birth_start': None,
+                'date_of_birth_end': None, 'department_id': 1}
+        for name, filters, index_name in (
+                ('test_birthday', {'date_of_birth_start': date(1990, 1, 1),
+                                   'date_of_birth_end': date(2000, 1, 1)},
+                 'ix_employees_department_id_date_of_birth'),
+                ('test_salary', {'salary_min': 1000, 'salary_max': 2000},
+                 'ix_employees_department_id_salary')):
+            with self.subTest(name):
+                plan = explain(employees_query(dict(args, **filters)))
+                self.assertTrue(uses_index(plan, index_name))
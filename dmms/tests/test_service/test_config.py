@@ -0,0 +1,60 @@
+import os
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from dmms.service.config import engine_options, optional_float
+from dmms.service.db import pool_config
+
+
+class EngineOptionsTest(unittest.TestCase):
+    """Test engine and pool options built from environment"""
+    def test_default_options(self):
+        with mock.patch.dict(os.environ, clear=True):
+            actual_options = engine_options('mysql+mysqldb://localhost/db')
+        expected_options = {'pool_size': 10, 'max_overflow': 20,
+                            'pool_recycle': 3600, 'pool_pre_ping': True,
+                            'pool_timeout': 30}
+        self.assertEqual(actual_options, expected_options)
+
+    def test_environment_options(self):
+        environ = {'DB_POOL_SIZE': '5', 'DB_MAX_OVERFLOW': '0',
+                   'DB_POOL_RECYCLE': '280', 'DB_POOL_PRE_PING': 'false',
+                   'DB_POOL_TIMEOUT': '3'}
+        with mock.patch.dict(os.environ, environ, clear=True):
+            actual_options = engine_options('mysql+pymysql://localhost/db')
+        expected_options = {'pool_size': 5, 'max_overflow': 0,
+                            'pool_recycle': 280, 'pool_pre_ping': False,
+                            'pool_timeout': 3}
+        self.assertEqual(actual_options, expected_options)
+
+    def test_sqlite_options(self):
+        actual_options = engine_options('sqlite:///dmms.db')
+        expected_options = {}
+        self.assertEqual(actual_options, expected_options)
+
+    def test_pool_config(self):
+        engine = create_engine('sqlite://', poolclass=QueuePool,
+                               pool_size=5, max_overflow=0,
+                               pool_recycle=280, pool_pre_ping=True)
+
+        actual_config = pool_config(engine)
+        expected_config = {'driver': 'pysqlite', 'pool': 'QueuePool',
+                           'size': 5, 'max_overflow': 0, 'timeout': 30,
+                           'recycle': 280, 'pre_ping': True}
+        self.assertEqual(actual_config, expected_config)
+
+
+class OptionalFloatTest(unittest.TestCase):
+    """Test numbers of environment which can be disabled"""
+    def test_optional_float(self):
+        for value, expected_value in ((None, 500.0), ('250', 250.0),
+                                      ('0', 0.0), ('none', None),
+                                      ('None', None), ('', None)):
+            with self.subTest(value=value):
+                environ = {} if value is None else {'SLOW_QUERY_MS': value}
+                with mock.patch.dict(os.environ, environ, clear=True):
+                    actual_value = optional_float('SLOW_QUERY_MS', 500)
+                self.assertEqual(actual_value, expected_value)
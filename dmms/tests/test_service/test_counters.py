@@ -0,0 +1,80 @@
+import unittest
+
+from dmms.rest.app import app
+from dmms.service.db import db
+from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.counters import recount, wrong_counters
+
+
+class DepartmentCountersTest(unittest.TestCase):
+    """Test headcount and salary sum counters of departments"""
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add_all([DepartmentsModel(name='Test1'),
+                            DepartmentsModel(name='Test2')])
+        db.session.add_all([EmployeesModel(name=f'Employee{number}',
+                                           date_of_birth='1991-01-09',
+                                           salary=1000 * number,
+                                           department_id=1)
+                            for number in range(1, 4)])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def counters(self):
+        """Get counters of departments ordered by id"""
+        return [(department.headcount, department.salary_sum)
+                for department in DepartmentsModel.query.order_by(
+                    DepartmentsModel.id)]
+
+    def test_counters_follow_writes(self):
+        for name, write, expected_counters in (
+                ('test_insert',
+                 lambda: db.session.add(EmployeesModel(
+                     name='Employee4', date_of_birth='1991-01-09',
+                     salary=500, department_id=2)),
+                 [(3, 6000), (1, 500)]),
+                ('test_salary_change',
+                 lambda: EmployeesModel.query.filter_by(id=1).update(
+                     {'salary': 1500}),
+                 [(3, 6500), (1, 500)]),
+                ('test_department_move',
+                 lambda: EmployeesModel.query.filter_by(id=2).update(
+                     {'department_id': 2}),
+                 [(2, 4500), (2, 2500)]),
+                ('test_name_change',
+                 lambda: EmployeesModel.query.filter_by(id=3).update(
+                     {'name': 'Renamed'}),
+                 [(2, 4500), (2, 2500)]),
+                ('test_delete',
+                 lambda: EmployeesModel.query.filter(
+                     EmployeesModel.id.in_([3, 4])).delete(
+                     synchronize_session=False),
+                 [(1, 1500), (1, 2000)])):
+            with self.subTest(name):
+                write()
+                db.session.commit()
+                self.assertEqual(self.counters(), expected_counters)
+
+    def test_recount(self):
+        DepartmentsModel.query.update({'headcount': 7, 'salary_sum': 1})
+        db.session.commit()
+
+        with self.subTest('test_wrong_counters'):
+            actual_ids = [row['id'] for row in wrong_counters()]
+            expected_ids = [1, 2]
+            self.assertEqual(actual_ids, expected_ids)
+
+        with self.subTest('test_recounted'):
+            actual_count = recount()
+            db.session.commit()
+            self.assertEqual(actual_count, 2)
+            self.assertEqual(self.counters(), [(3, 6000), (0, 0)])
+            self.assertEqual(wrong_counters(), [])
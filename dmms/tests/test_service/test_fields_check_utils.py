@@ -0,0 +1,27 @@
+import unittest
+
+from werkzeug.exceptions import HTTPException
+
+from dmms.service.fields_check_utils import value_is_positive
+
+
+class ValueIsPositiveTest(unittest.TestCase):
+    """Test check of positive values"""
+
+    def test_all_keys_are_checked(self):
+        # every key is checked, not only the first one
+        for args in ({'limit': -1, 'salary': 100},
+                     {'limit': 10, 'salary': -100},
+                     {'limit': None, 'salary': -0.5}):
+            with self.subTest(args=args):
+                with self.assertRaises(HTTPException) as error:
+                    value_is_positive(['limit', 'salary'], args)
+                self.assertEqual(error.exception.code, 406)
+
+    def test_positive_and_empty_values_pass(self):
+        for args in ({'limit': 1, 'salary': 100},
+                     {'limit': None, 'salary': None},
+                     {'limit': 0, 'salary': 1}):
+            with self.subTest(args=args):
+                self.assertIsNone(value_is_positive(['limit', 'salary'],
+                                                    args))
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+
+from flask_restful import marshal
+from flask_restful.representations.json import output_json as default_json
+
+from dmms.rest.app import app
+from dmms.service.db import db
+from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.fields_structure import (compile_structure,
+                                           departments_structure,
+                                           employees_department_structure,
+                                           employees_structure, orjson,
+                                           output_json)
+
+
+class CompiledStructureTest(unittest.TestCase):
+    """Test compiled structures give the same result as marshal"""
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department = DepartmentsModel(name='Test1')
+        test_employee1 = EmployeesModel(name='Employee1',
+                                        date_of_birth='1991-01-09',
+                                        salary=2500,
+                                        department=test_department)
+        test_employee2 = EmployeesModel(name='Employee2',
+                                        date_of_birth='1995-07-15',
+                                        salary=1500)
+        db.session.add_all([test_department, test_employee1, test_employee2])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_orm_objects(self):
+        for structure, query in ((employees_structure, EmployeesModel.query),
+                                 (employees_department_structure,
+                                  EmployeesModel.query),
+                                 (departments_structure,
+                                  DepartmentsModel.query)):
+            with self.subTest(structure=list(structure)):
+                rows = query.all()
+                actual_result = compile_structure(structure)(rows)
+                expected_result = marshal(rows, structure)
+                self.assertEqual(actual_result, expected_result)
+
+    def test_row_tuples_and_dicts(self):
+        rows = db.session.query(EmployeesModel.id, EmployeesModel.name,
+                                EmployeesModel.salary).all()
+        serializer = compile_structure(employees_structure)
+
+        with self.subTest('test_row_tuples'):
+            actual_result = serializer(rows)
+            expected_result = marshal([row._asdict() for row in rows],
+                                      employees_structure)
+            self.assertEqual(actual_result, expected_result)
+
+        with self.subTest('test_dicts'):
+            actual_result = serializer([row._asdict() for row in rows])
+            self.assertEqual(actual_result, expected_result)
+
+        with self.subTest('test_none'):
+            actual_result = serializer(None)
+            expected_result = marshal(None, employees_structure)
+            self.assertEqual(actual_result, expected_result)
+
+
+class OutputJsonTest(unittest.TestCase):
+    """Test bytes of JSON responses"""
+    def setUp(self):
+        """Push test request context"""
+        self.request_context = app.test_request_context()
+        self.request_context.push()
+        self.data = [{'name': 'Employee1', 'salary': 2500.0,
+                      'department_id': None, 'id': 1}]
+
+    def tearDown(self):
+        """Pop test request context"""
+        self.request_context.pop()
+
+    def test_default_matches_flask_restful(self):
+        actual_body = output_json(self.data, 200).get_data()
+        expected_body = default_json(self.data, 200).get_data()
+        self.assertEqual(actual_body, expected_body)
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson_enabled(self):
+        with mock.patch.dict(app.config, {'ORJSON_RESPONSES': True}):
+            actual_body = output_json(self.data, 200).get_data()
+        expected_body = orjson.dumps(self.data) + b'\n'
+        self.assertEqual(actual_body, expected_body)
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+from dmms.rest.app import app
+from dmms.service.db import db
+from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service import importer
+
+
+class ImporterTest(unittest.TestCase):
+    """Test bulk import of departments and employees"""
+    def setUp(self):
+        """Create test tables and files"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add(DepartmentsModel(name='Test1'))
+        db.session.commit()
+        self.directory = tempfile.TemporaryDirectory()
+        self.departments = os.path.join(self.directory.name,
+                                        'departments.csv')
+        with open(self.departments, 'w') as file:
+            file.write('name\nTest1\nTest2\n')
+        self.employees = os.path.join(self.directory.name,
+                                      'employees.ndjson')
+        with open(self.employees, 'w') as file:
+            for number in range(1, 6):
+                file.write(json.dumps({'name': f'Employee{number}',
+                                       'date_of_birth': '1991-01-09',
+                                       'salary': 1000 * number,
+                                       'department': 'Test2'}) + '\n')
+
+    def tearDown(self):
+        """Drop test tables and remove files"""
+        db.session.remove()
+        db.drop_all()
+        self.directory.cleanup()
+
+    def test_import_files(self):
+        report = importer.import_files(self.departments, self.employees,
+                                       batch_size=2)
+
+        with self.subTest('test_report'):
+            actual_report = [(table, count) for table, count, _ in report]
+            expected_report = [('departments', 1), ('employees', 5)]
+            self.assertEqual(actual_report, expected_report)
+
+        with self.subTest('test_employees'):
+            actual_employees = [
+                (employee.name, str(employee.date_of_birth),
+                 employee.salary, employee.department.name)
+                for employee in EmployeesModel.query.order_by(
+                    EmployeesModel.id)]
+            expected_employees = [(f'Employee{number}', '1991-01-09',
+                                   1000 * number, 'Test2')
+                                  for number in range(1, 6)]
+            self.assertEqual(actual_employees, expected_employees)
+
+        with self.subTest('test_department_counters'):
+            department = DepartmentsModel.query.filter_by(
+                name='Test2').one()
+            actual_counters = (department.headcount, department.salary_sum)
+            expected_counters = (5, 15000)
+            self.assertEqual(actual_counters, expected_counters)
+
+    def test_import_unknown_department(self):
+        with self.assertRaises(ValueError):
+            importer.import_files(None, self.employees, batch_size=2)
+
+    def test_load_data_value(self):
+        for name, value, expected_value in (
+                ('test_null', None, r'\N'),
+                ('test_backslash', r'Back\slash', r'Back\\slash'),
+                ('test_null_like_name', r'\N', r'\\N'),
+                ('test_number', 1000.0, 1000.0)):
+            with self.subTest(name=name):
+                actual_value = importer.load_data_value(value)
+                self.assertEqual(actual_value, expected_value)
@@ -0,0 +1,171 @@
+import statistics
+import unittest
+
+import numpy as np
+from sqlalchemy import event
+
+from dmms.rest.app import app
+from dmms.service.db import db
+from dmms.models.model import DepartmentsModel, EmployeesModel
+from dmms.service.salary_stats import (SalaryColumns, fetch_salaries,
+                                       histogram, histogram_edges,
+                                       percentiles, salary_stats)
+from dmms.service.versions import bump_version
+
+
+class SalaryStatsTest(unittest.TestCase):
+    """Test salary statistics computation"""
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.salaries = [1000, 1500, 1500, 2000, 2600, 3100, 4000, 9000]
+        db.session.add_all([DepartmentsModel(name='Test1'),
+                            DepartmentsModel(name='Test2')])
+        db.session.add_all([EmployeesModel(name=f'Employee{number}',
+                                           date_of_birth='1991-01-09',
+                                           salary=salary,
+                                           department_id=number % 2 + 1)
+                            for number, salary in enumerate(self.salaries)])
+        db.session.commit()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_percentiles(self):
+        expected_deciles = statistics.quantiles(self.salaries, n=10,
+                                                method='inclusive')
+        fractions = {'p0': 0, 'p10': 0.1, 'p50': 0.5, 'p90': 0.9, 'p100': 1}
+        actual_values = percentiles(fetch_salaries(), fractions)
+        for name, expected_value in (('p0', 1000),
+                                     ('p10', expected_deciles[0]),
+                                     ('p50', expected_deciles[4]),
+                                     ('p90', expected_deciles[8]),
+                                     ('p100', 9000)):
+            with self.subTest(name=name):
+                self.assertAlmostEqual(actual_values[name], expected_value)
+
+    def test_histogram_edges(self):
+        actual_value = histogram_edges(1000, 9000, 4)
+        expected_value = [1000, 3000, 5000, 7000, 9000]
+        self.assertEqual(actual_value, expected_value)
+
+    def test_histogram(self):
+        with self.subTest('test_buckets'):
+            actual_value = histogram(fetch_salaries(), 4)
+            expected_value = [{'from': 1000, 'to': 3000, 'count': 5},
+                              {'from': 3000, 'to': 5000, 'count': 2},
+                              {'from': 5000, 'to': 7000, 'count': 0},
+                              {'from': 7000, 'to': 9000, 'count': 1}]
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_same_values'):
+            actual_value = histogram(np.array([1500.0, 1500.0]), 4)
+            expected_value = [{'from': 1500, 'to': 1500, 'count': 2}]
+            self.assertEqual(actual_value, expected_value)
+
+    def test_fetch_salaries(self):
+        for department_id, expected_salaries in (
+                (None, sorted(self.salaries)),
+                (2, sorted(self.salaries[1::2])),
+                (3, [])):
+            with self.subTest(department_id=department_id):
+                actual_salaries = fetch_salaries(department_id).tolist()
+                self.assertEqual(actual_salaries, expected_salaries)
+
+    def test_salary_stats(self):
+        stats = salary_stats(fetch_salaries(), 4)
+
+        with self.subTest('test_moments'):
+            actual_value = (stats['count'], stats['mean'], stats['stddev'])
+            expected_value = (len(self.salaries),
+                              statistics.mean(self.salaries),
+                              statistics.pstdev(self.salaries))
+            self.assertEqual(actual_value[0], expected_value[0])
+            self.assertAlmostEqual(actual_value[1], expected_value[1])
+            self.assertAlmostEqual(actual_value[2], expected_value[2])
+
+        with self.subTest('test_median'):
+            self.assertAlmostEqual(stats['p50'],
+                                   statistics.median(self.salaries))
+
+        with self.subTest('test_histogram_counts'):
+            actual_counts = [bucket['count']
+                             for bucket in stats['histogram']]
+            expected_counts = [5, 2, 0, 1]
+            self.assertEqual(actual_counts, expected_counts)
+
+    def test_stddev_of_large_salaries(self):
+        salaries = np.array([1e9 + 1, 1e9 + 2, 1e9 + 3])
+        actual_value = salary_stats(salaries, 4)['stddev']
+        expected_value = statistics.pstdev([1, 2, 3])
+        self.assertAlmostEqual(actual_value, expected_value)
+
+    def test_salary_stats_of_department(self):
+        stats = salary_stats(fetch_salaries(2), 4)
+
+        actual_value = (stats['count'], stats['min'], stats['max'])
+        expected_value = (4, 1500, 9000)
+        self.assertEqual(actual_value, expected_value)
+
+    def test_salary_stats_without_employees(self):
+        stats = salary_stats(fetch_salaries(3), 4)
+
+        actual_value = (stats['count'], stats['p50'], stats['histogram'])
+        expected_value = (0, None, [])
+        self.assertEqual(actual_value, expected_value)
+
+
+class SalaryColumnsTest(unittest.TestCase):
+    """Test sorted salaries kept in memory"""
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.add(DepartmentsModel(name='Test1'))
+        db.session.add_all([EmployeesModel(name=f'Employee{number}',
+                                           date_of_birth='1991-01-09',
+                                           salary=salary, department_id=1)
+                            for number, salary in enumerate((2000, 1000))])
+        db.session.commit()
+        self.columns = SalaryColumns()
+        self.columns.ttl = 60
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_columns_follow_writes(self):
+        queries = []
+
+        def count_query(*args):
+            queries.append(args)
+
+        def add_employee():
+            db.session.add(EmployeesModel(name='Employee2',
+                                          date_of_birth='1991-01-09',
+                                          salary=1500, department_id=1))
+            bump_version('employees')
+            db.session.commit()
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        try:
+            for name, write, expected_salaries, expected_queries in (
+                    ('test_first_read', lambda: None, [1000, 2000], 2),
+                    ('test_kept', lambda: None, [1000, 2000], 1),
+                    ('test_write', add_employee, [1000, 1500, 2000], 2)):
+                with self.subTest(name=name):
+                    write()
+                    del queries[:]
+                    actual_salaries = self.columns.get().tolist()
+                    self.assertEqual(actual_salaries, expected_salaries)
+                    self.assertEqual(len(queries), expected_queries)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_query)
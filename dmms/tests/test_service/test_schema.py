@@ -0,0 +1,88 @@
+import unittest
+
+from werkzeug.exceptions import HTTPException
+
+from dmms.rest.app import app
+from dmms.service import parsers
+
+
+def outcome(parse):
+    """Get parsed arguments or code and message of error"""
+    try:
+        return dict(parse())
+    except HTTPException as error:
+        return error.code, getattr(error, 'data', error.description)
+
+
+class SchemaTest(unittest.TestCase):
+    """Test compiled schemas give the same results as reqparse"""
+
+    def assert_same_as_reqparse(self, schema, cases):
+        parser = schema.to_reqparse()
+
+        def parse_and_check():
+            args = parser.parse_args(strict=True)
+            for check in schema.checks():
+                check(args)
+            return args
+
+        for kwargs in cases:
+            with self.subTest(**kwargs), \
+                    app.test_request_context('/', **kwargs):
+                actual_result = outcome(schema.parse_args)
+                expected_result = outcome(parse_and_check)
+                self.assertEqual(actual_result, expected_result)
+
+    def test_args_schemas(self):
+        self.assert_same_as_reqparse(parsers.employee_get_schema, [
+            {},
+            {'query_string': {'id': ['1', '2'], 'limit': '5'}},
+            {'query_string': {'date_of_birth_start': '1990-01-01',
+                              'date_of_birth_end': ''}},
+            {'query_string': {'date_of_birth_start': '1990-13-01',
+                              'id': 'x'}},
+            {'query_string': {'include': 'everything'}},
+            {'query_string': {'limit': '-1'}},
+            {'query_string': {'limit': '0', 'after': '3'}},
+            {'query_string': {'unknown': '1', 'other': '2'}},
+            {'query_string': {'id': '1'}, 'json': {'name': 'Test'}},
+        ])
+
+    def test_json_schemas(self):
+        self.assert_same_as_reqparse(parsers.employee_post_schema, [
+            {'json': {'name': 'Employee1', 'date_of_birth': '1991-01-09',
+                      'salary': 2500, 'department_id': 1}},
+            {'json': {'name': 'Employee1', 'salary': 2500}},
+            {'json': {'name': 'Employee1', 'date_of_birth': '1991-01-09',
+                      'salary': -5, 'department_id': 1}},
+            {'json': {'name': None, 'date_of_birth': 'yesterday',
+                      'salary': 'a lot', 'department_id': 1}},
+            {'json': {'name': 'Employee1', 'position': 'manager'}},
+            {'json': {'name': 'Employee1'}, 'query_string': {'id': '1'}},
+            {'data': 'name=Employee1'},
+        ])
+        self.assert_same_as_reqparse(parsers.employee_put_schema, [
+            {'json': {}},
+            {'json': {'salary': 0}},
+            {'json': {'salary': -1}},
+        ])
+        self.assert_same_as_reqparse(parsers.bulk_update_schema, [
+            {'json': {'ids': [1, '2'], 'set': {'salary': 1}}},
+            {'json': {'ids': [1, 'x'], 'set': 'salary'}},
+            {'json': {'ids': 3}},
+        ])
+
+    def test_parse_item(self):
+        with app.test_request_context('/'):
+            with self.subTest('test_valid_item'):
+                actual_result = outcome(lambda: parsers.department_post_schema
+                                        .parse_item({'name': 'Test1'}))
+                expected_result = {'name': 'Test1'}
+                self.assertEqual(actual_result, expected_result)
+
+            with self.subTest('test_unknown_key'):
+                actual_result = outcome(lambda: parsers.department_post_schema
+                                        .parse_item({'name': 'Test1',
+                                                     'id': 1}))
+                expected_result = (400, 'Unknown arguments: id')
+                self.assertEqual(actual_result, expected_result)
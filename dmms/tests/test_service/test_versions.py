@@ -0,0 +1,69 @@
+import unittest
+
+from dmms.rest.app import app
+from dmms.service.db import db
+from dmms.models.model import TableVersionsModel
+from dmms.service.versions import (VERSIONED_TABLES, bump_version,
+                                   insert_missing_versions)
+
+
+class TableVersionsTest(unittest.TestCase):
+    """Test versions of tables changed by writes"""
+    def setUp(self):
+        """Create test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def versions(self):
+        """Get versions of tables by name"""
+        return {row.name: row.version
+                for row in TableVersionsModel.query.all()}
+
+    def test_bump_creates_missing_row(self):
+        for _ in range(2):
+            bump_version('departments')
+            db.session.commit()
+        actual_versions = self.versions()
+        expected_versions = {'departments': 2}
+        self.assertEqual(actual_versions, expected_versions)
+
+    def test_bump_after_commit(self):
+        for name, table, finish, expected_versions in (
+                ('test_before_commit', 'employees', lambda: None, {}),
+                ('test_rollback', 'departments', db.session.rollback, {}),
+                ('test_commit', 'employees', db.session.commit,
+                 {'employees': 1})):
+            with self.subTest(name=name):
+                bump_version(table)
+                finish()
+                # versions are read by other connection, which doesn't
+                # see uncommitted rows
+                actual_versions = dict(db.engine.execute(
+                    TableVersionsModel.__table__.select()).fetchall())
+                self.assertEqual(actual_versions, expected_versions)
+
+    def test_insert_keeps_existing_rows(self):
+        # row created by concurrent writer is kept and bumped
+        db.session.add(TableVersionsModel(name='employees', version=3))
+        db.session.commit()
+        for name, write, expected_versions in (
+                ('test_insert_missing',
+                 lambda: insert_missing_versions(VERSIONED_TABLES),
+                 {'departments': 0, 'employees': 3}),
+                ('test_insert_again',
+                 lambda: insert_missing_versions(VERSIONED_TABLES),
+                 {'departments': 0, 'employees': 3}),
+                ('test_bump_existing',
+                 lambda: bump_version('employees'),
+                 {'departments': 0, 'employees': 4})):
+            with self.subTest(name=name):
+                write()
+                db.session.commit()
+                actual_versions = self.versions()
+                self.assertEqual(actual_versions, expected_versions)
@@ -0,0 +1,141 @@
+import unittest
+from unittest import mock
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from dmms.rest.app import app
+from dmms.service.config import TestConfig
+from dmms.service.db import db
+from dmms.models.model import DepartmentsModel
+from dmms.service.metrics import RequestMetrics
+from dmms.views.app import create_app
+from dmms.views.client import HttpClient, LocalClient
+
+
+class LocalClientTest(unittest.TestCase):
+    """Test in-process client of REST service"""
+    def setUp(self):
+        """Create and fill test tables"""
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        test_department1 = DepartmentsModel(name='Test1')
+        test_department2 = DepartmentsModel(name='Test2')
+        db.session.add_all([test_department1, test_department2])
+        db.session.commit()
+        self.client = LocalClient(app)
+
+    def tearDown(self):
+        """Drop test tables"""
+        db.session.remove()
+        db.drop_all()
+
+    def test_get_same_as_http(self):
+        response = self.client.get('/departments', params={'id': ['2']})
+        http_response = app.test_client().get('/departments',
+                                              query_string={'id': ['2']})
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json()
+            expected_value = http_response.json
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = http_response.status_code
+            self.assertEqual(actual_code, expected_code)
+
+    def test_post(self):
+        response = self.client.post('/departments', json={'name': 'Test3'})
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json()
+            expected_value = 'New department Test3 with id 3 was added'
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 201
+            self.assertEqual(actual_code, expected_code)
+
+    def test_abort(self):
+        response = self.client.put('/departments/42', json={'name': 'Test'})
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json()
+            expected_value = {"message": "Department 42 doesn't exist"}
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 404
+            self.assertEqual(actual_code, expected_code)
+
+    def test_error_same_as_http(self):
+        # connection is lost while department is added
+        error = OperationalError('INSERT', {}, Exception('gone away'))
+        with mock.patch.object(db.session, 'commit', side_effect=error):
+            response = self.client.post('/departments',
+                                        json={'name': 'Test3'})
+            db.session.rollback()
+            http_response = app.test_client().post('/departments',
+                                                   json={'name': 'Test3'})
+            db.session.rollback()
+
+        with self.subTest('test_response_value'):
+            actual_value = response.json()
+            expected_value = http_response.json
+            self.assertEqual(actual_value, expected_value)
+
+        with self.subTest('test_response_code'):
+            actual_code = response.status_code
+            expected_code = 500
+            self.assertEqual(actual_code, expected_code)
+
+    def test_wrong_url(self):
+        response = self.client.get('/wrong_url')
+
+        actual_code = response.status_code
+        expected_code = 404
+        self.assertEqual(actual_code, expected_code)
+
+    def test_metrics_of_views_request(self):
+        views = Flask('views')
+        RequestMetrics().init_app(views)
+        views.add_url_rule('/', 'get_home', lambda: str(len(
+            self.client.get('/departments').json())))
+        queries = []
+
+        def count_query(*args):
+            queries.append(args)
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        try:
+            response = views.test_client().get('/')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        with self.subTest('test_query_count'):
+            actual_count = int(response.headers['X-Query-Count'])
+            expected_count = len(queries)
+            self.assertEqual(actual_count, expected_count)
+
+        with self.subTest('test_metrics'):
+            labels = 'app="views",endpoint="/",method="GET"'
+            self.assertIn(f'dmms_request_queries_total{{{labels}}} '
+                          f'{len(queries)}',
+                          '\n'.join(views.extensions['request_metrics']
+                                    .samples()))
+
+    def test_client_of_app_config(self):
+        for backend, expected_class in (('local', LocalClient),
+                                        ('http', HttpClient)):
+            with self.subTest(backend=backend):
+                config = type('ClientConfig', (TestConfig,),
+                              {'VIEWS_CLIENT_BACKEND': backend})
+                views = create_app(config)
+                actual_class = type(views.extensions['service_client'])
+                self.assertIs(actual_class, expected_class)
@@ -1,20 +1,32 @@
 from flask import Flask, render_template
 
+from dmms.service.config import run_config
+from dmms.service.metrics import RequestMetrics
 from dmms.views.blueprints.departments import departments_blueprint
 from dmms.views.blueprints.employees import employees_blueprint
+from dmms.views.client import create_client
 
 
-app = Flask(__name__, template_folder='../templates')
-app.config['SECRET_KEY'] = 'my_secret_key'
-app.register_blueprint(departments_blueprint)
-app.register_blueprint(employees_blueprint)
-
-
-@app.route('/', methods=['GET'])
 def get_home():
     """Show home page"""
     return render_template('index.html')
 
 
+def create_app(config=None) -> Flask:
+    """Create views app"""
+    config = config or run_config()
+    app = Flask(__name__, template_folder='../templates')
+    app.config['SECRET_KEY'] = 'my_secret_key'
+    app.config['SLOW_QUERY_MS'] = config.SLOW_QUERY_MS
+    app.extensions['service_client'] = create_client(config)
+    RequestMetrics().init_app(app)
+    app.register_blueprint(departments_blueprint)
+    app.register_blueprint(employees_blueprint)
+    app.add_url_rule('/', 'get_home', get_home, methods=['GET'])
+    return app
+
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True, host='localhost', port='5001')
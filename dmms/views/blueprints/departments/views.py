@@ -1,44 +1,48 @@
-import requests
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 
+from dmms.views.client import service_client
+from dmms.views.pagination import fetch_all_pages, next_page_link
+
 departments_blueprint = Blueprint('departments', __name__)
 
 
 @departments_blueprint.route('/departments', methods=['GET'])
 def get_departments():
     """Show all departments"""
-    all_departments = requests.get('http://localhost:5000/departments').json()
+    response = service_client.get('/departments/summary',
+                                  params={'after': request.args.get('after')})
     data = {}
-    for department in all_departments:
-        sum_salary = sum([employee['salary'] for employee
-                          in department['employees']])
-        num_employees = len(department['employees'])
-        avg_salary = sum_salary / num_employees if num_employees else '-'
+    for department in response.json():
+        avg_salary = department['salary_avg'] \
+            if department['headcount'] else '-'
         link = url_for('departments.get_department',
                        department_id=department['id'])
         value = {'avg_salary': avg_salary, 'link': link}
         data[department['name']] = value
-    return render_template('departments.html', data=data)
+    next_page = next_page_link('departments.get_departments', response)
+    return render_template('departments.html', data=data,
+                           next_page=next_page)
 
 
 @departments_blueprint.route('/departments/<department_id>', methods=['GET'])
 def get_department(department_id):
     """Show specific department"""
-    department = requests.get('http://localhost:5000/departments',
-                              params={'id': [department_id]}).json()[0]
+    department = service_client.get(
+        '/departments', params={'id': [department_id],
+                                'include': 'none'}).json()[0]
     data = {'id': department_id, 'name': department['name'], 'employees': {}}
-
+    params = {'department_id': department_id}
     if request.args:
         start = request.args['date_of_birth_start']
         end = request.args['date_of_birth_end']
-        # TODO : add filter by birthday to API
-        department['employees'] = [e for e in department['employees']
-                                   if start <= e['date_of_birth'] <= end]
+        # employees are filtered by API
+        params.update(date_of_birth_start=start, date_of_birth_end=end)
         dates = {'start': start,
                  'end': end}
     else:
         dates = {}
-    for employee in department['employees']:
+    employees = fetch_all_pages('/employees', params=params)
+    for employee in employees:
         value = {
             'name': employee['name'],
             'date_of_birth': employee['date_of_birth'],
@@ -53,8 +57,9 @@ def get_department(department_id):
                              methods=['GET'])
 def edit_department(department_id):
     """Show edit department page"""
-    department = requests.get('http://localhost:5000/departments',
-                              params={'id': [department_id]}).json()[0]
+    department = service_client.get('/departments',
+                                    params={'id': [department_id],
+                                            'include': 'none'}).json()[0]
     data = {'title': 'Edit department',
             'message': f"Please edit info for {department['name']} department",
             'name': department['name']}
@@ -72,10 +77,8 @@ def save_editing_department(department_id):
     if not name:
         flash("Name of department can't be empty")
         return redirect(url_for('departments.edit_department'))
-    data = f'{{"name": "{name}"}}'
-    save = requests.put(f'http://localhost:5000/departments/{department_id}',
-                        data=data,
-                        headers={'Content-Type': 'application/json'})
+    save = service_client.put(f'/departments/{department_id}',
+                              json={'name': name})
     if save.status_code != 200:
         flash("Sorry your department wasn't edited. Please try again later")
         return redirect(url_for('departments.edit_department'))
@@ -87,8 +90,7 @@ def save_editing_department(department_id):
                              methods=['GET'])
 def delete_department(department_id):
     """Delete specific department"""
-    delete = requests.delete(
-        f'http://localhost:5000/departments/{department_id}')
+    delete = service_client.delete(f'/departments/{department_id}')
     # department can't be deleted if some employee is assigned to it.
     # if it is so API would return message why employee can't be deleted
     if delete.status_code != 200:
@@ -115,9 +117,7 @@ def save_department():
     if not name:
         flash('Please provide name of department')
         return redirect(url_for('departments.add_department'))
-    data = f'{{"name": "{name}"}}'
-    save = requests.post('http://localhost:5000/departments', data=data,
-                         headers={'Content-Type': 'application/json'})
+    save = service_client.post('/departments', json={'name': name})
     if save.status_code != 201:
         flash("Sorry your department wasn't saved. Please try again later")
         return redirect(url_for('departments.add_department'))
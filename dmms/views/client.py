@@ -0,0 +1,127 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import requests
+from flask import current_app, request
+from flask_restful.utils import unpack
+from requests.adapters import HTTPAdapter
+from werkzeug.local import LocalProxy
+
+
+class ServiceResponse:
+    """Response of REST service resource called in the same process"""
+    def __init__(self, data: Any, status_code: int, headers: dict):
+        self.data = data
+        self.status_code = status_code
+        self.headers = headers
+
+    def json(self) -> Any:
+        """Get response data"""
+        return self.data
+
+    @property
+    def text(self) -> str:
+        """Get response data as text"""
+        if isinstance(self.data, str):
+            return self.data
+        return json.dumps(self.data)
+
+
+class ServiceClient(ABC):
+    """Base client of REST service"""
+    @abstractmethod
+    def request(self, method: str, path: str, params: Optional[dict] = None,
+                json: Any = None):
+        """Send request to REST service"""
+
+    def get(self, path: str, params: Optional[dict] = None):
+        """Send GET request to REST service"""
+        return self.request('GET', path, params=params)
+
+    def post(self, path: str, json: Any = None):
+        """Send POST request to REST service"""
+        return self.request('POST', path, json=json)
+
+    def put(self, path: str, json: Any = None):
+        """Send PUT request to REST service"""
+        return self.request('PUT', path, json=json)
+
+    def delete(self, path: str):
+        """Send DELETE request to REST service"""
+        return self.request('DELETE', path)
+
+
+class HttpClient(ServiceClient):
+    """Client which sends requests to REST service over HTTP
+
+    Connections are kept alive in pool of session and reused between
+    requests.
+    """
+    def __init__(self, base_url: str, timeout: float, pool_size: int):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, path: str, params: Optional[dict] = None,
+                json: Any = None) -> requests.Response:
+        """Send request to REST service"""
+        return self.session.request(method, f'{self.base_url}{path}',
+                                    params=params, json=json,
+                                    timeout=self.timeout)
+
+
+class LocalClient(ServiceClient):
+    """Client which calls REST service resources in the same process
+
+    Data returned by resources is passed to views as is, so it isn't
+    serialized to JSON and parsed back.
+    """
+    def __init__(self, app=None):
+        self._app = app
+
+    @property
+    def app(self):
+        """Get REST service app. It is imported on first request"""
+        if self._app is None:
+            from dmms.rest.app import app
+            self._app = app
+        return self._app
+
+    def request(self, method: str, path: str, params: Optional[dict] = None,
+                json: Any = None) -> ServiceResponse:
+        """Call REST service resource"""
+        with self.app.test_request_context(path, method=method,
+                                           query_string=params, json=json):
+            try:
+                if request.routing_exception:
+                    raise request.routing_exception
+                view = self.app.view_functions[request.url_rule.endpoint]
+                resource = view.view_class()
+                handler = getattr(resource, method.lower())
+                data, code, headers = unpack(handler(**request.view_args))
+            except Exception as error:
+                # error is answered by error handlers of REST app, so
+                # response is the same as response sent over HTTP
+                response = self.app.make_response(
+                    self.app.handle_user_exception(error))
+                data = response.get_json() if response.is_json else \
+                    response.get_data(as_text=True)
+                return ServiceResponse(data, response.status_code,
+                                       dict(response.headers))
+        return ServiceResponse(data, code, dict(headers))
+
+
+def create_client(config) -> ServiceClient:
+    """Create client of REST service selected in config"""
+    if config.VIEWS_CLIENT_BACKEND == 'local':
+        return LocalClient()
+    return HttpClient(config.REST_API_URL, config.REST_API_TIMEOUT,
+                      config.REST_API_POOL_SIZE)
+
+
+# client of views app handling current request
+service_client = LocalProxy(lambda: current_app.extensions['service_client'])
@@ -0,0 +1,28 @@
+from typing import List, Optional
+
+from flask import request, url_for
+
+from dmms.views.client import service_client
+
+
+def fetch_all_pages(path: str, params: Optional[dict] = None) -> List:
+    """Get items of all pages by following next page cursors"""
+    params = dict(params or {})
+    items = []
+    while True:
+        response = service_client.get(path, params=params)
+        items.extend(response.json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return items
+        params['after'] = cursor
+
+
+def next_page_link(endpoint: str, response) -> Optional[str]:
+    """Build link to next page of view if API returned next page cursor"""
+    cursor = response.headers.get('X-Next-Cursor')
+    if not cursor:
+        return None
+    args = request.args.to_dict()
+    args['after'] = cursor
+    return url_for(endpoint, **args)
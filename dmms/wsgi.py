@@ -1,7 +1,33 @@
-from dmms.rest.app import app as app_rest
-from dmms.views.app import app as app_views
+import os
+
+from flask import Flask
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.serving import run_simple
+
+# path REST app is mounted on when both apps are served by one process
+REST_API_PREFIX = os.environ.get('REST_API_PREFIX', '/api')
+
+# apps are imported by factories, so only app which is served is
+# imported, e.g. gunicorn 'dmms.wsgi:create_rest_app()'
+
+
+def create_rest_app() -> Flask:
+    """Get REST app"""
+    from dmms.rest.app import app
+    return app
+
+
+def create_views_app() -> Flask:
+    """Get views app"""
+    from dmms.views.app import app
+    return app
+
+
+def create_application() -> DispatcherMiddleware:
+    """Get views app answering on / and REST app on REST_API_PREFIX"""
+    return DispatcherMiddleware(create_views_app(),
+                                {REST_API_PREFIX: create_rest_app()})
 
 
 if __name__ == '__main__':
-    app_rest.run()
-    app_views.run()
+    run_simple('localhost', 5000, create_application(), threaded=True)